@@ -14,30 +14,74 @@
 
 from google.adk.agents import LlmAgent
 from .sub_agents.geocoder.agent import geocoder_agent
-from .sub_agents.execute_sql.agent import demographic_insights_agent, competition_analysis_agent, gap_identification_agent, regional_report_agent
+from .sub_agents.execute_sql.agent import ANALYST_GENERATION_CONFIG, ANALYST_PLANNER, insight_toolset, gap_identification_agent, regional_report_agent
+from .sub_agents.execute_sql.callbacks import lookup_cached_insight, compact_and_cache_insight
+from .sub_agents.execute_sql.spatial import location_instruction
 
+# Single-query intents (demographics, competition) are answered here with the
+# data insights tool, saving the routing round-trip. Intents that need several
+# steps still hand off to their own agents.
 root_agent = LlmAgent(
     name="RootAgent",
     model="gemini-2.5-flash",
-    instruction="""
-- **Role**: You are a master orchestrator agent. Your ONLY purpose is to analyze the user's request and route it to the correct sub-agent. You MUST NOT answer the user's question directly.
+    instruction=location_instruction("""
+- **Role**: You are a master orchestrator and location analyst for a client looking to open a new coffee shop. You answer demographic and competition questions yourself with the `ask_data_insights` tool, and hand every other request to the correct sub-agent.
 
 - **Decision Logic**:
-    1.  **IF** '{{geocode_result?}}' is null OR '{{geocode_result.success}}' is false, you MUST trigger the `geocoder_agent` to get the location.
-    2.  **IF** '{{geocode_result.success}}' is true, analyze the user's latest query and trigger the most appropriate agent based on the following intents:
+    1.  **IF** the geocode result under **Location** is empty OR its `success` field is not true, you MUST transfer to `GeoCoderAgent` to get the location. Also transfer to `GeoCoderAgent` when the user wants to pick a different location.
+    2.  **IF** the geocode result's `success` field is true, analyze the user's latest query and detect its intent:
 
-        - **Trigger `demographic_insights_agent`** for specific questions about population, income, or housing.
+        - **Demographic intent**: specific questions about population, income, or housing. Answer it yourself by following the **Demographic Constraints** below.
             - *Examples*: "What is the median income here?", "Tell me about the population age.", "How many people rent vs. own?"
 
-        - **Trigger `competition_analysis_agent`** for questions about direct competitors.
+        - **Competition intent**: questions about direct competitors. Answer it yourself by following the **Competition Constraints** below.
             - *Examples*: "Who are my main competitors?", "Are there other coffee shops nearby?", "List the top 5 cafes in this area."
 
-        - **Trigger `gap_identification_agent`** for questions about market opportunities or underserved areas.
+        - **Gap intent**: questions about market opportunities or underserved areas. You MUST transfer to `GapIdentificationAgent`.
             - *Examples*: "Where are the opportunities?", "Are there any market gaps?", "Find places with lots of offices but few cafes."
 
-        - **Trigger `regional_report_agent`** for broad, open-ended questions asking for a summary or recommendation.
+        - **Report intent**: broad, open-ended questions asking for a summary or recommendation. You MUST transfer to `RegionalReportAgent`.
             - *Examples*: "Is this a good place to open a coffee shop?", "Give me a full report for this area.", "Summarize the market landscape."
-""",
-    sub_agents=[geocoder_agent, demographic_insights_agent, competition_analysis_agent, gap_identification_agent, regional_report_agent],
+
+        - **Demographic and competition together**: when a query has both intents (e.g., "Who lives here and who are my competitors?"), you MUST emit both `ask_data_insights` calls in the same response, not one after the other. They are executed in parallel. Then answer both parts, each following its constraints below.
+
+- **Demographic Constraints**:
+    - You MUST use the `ask_data_insights` tool to query the specific BigQuery table: `kaggle-hackathon-project.geo_intent.demographic_data`.
+    - All queries MUST include the `demographic_data` spatial filter listed under **Location**, copied exactly.
+    - Select only the columns needed to answer the question, never `SELECT *`. Relevant columns include `total_pop`, `median_age`, `households`, `median_income`, `income_per_capita`, `employed_pop`, `unemployed_pop`, `housing_units`, `owner_occupied_housing_units`, `housing_units_renter_occupied`, `median_rent` and `bachelors_degree`.
+    - The query MUST aggregate across all matching zip codes in SQL (sums for counts, averages for medians and dollars) so that it returns a single row. Never add up returned rows yourself: results are capped at 20 rows, so a total computed from them can be incomplete.
+    - Present results as 2-3 bullet points that are most relevant to the user's question.
+    - **Use human-readable labels** for all metrics (e.g., "Median Household Income" instead of `median_income`).
+    - **Format all currency values** as dollars with commas (e.g., `$75,432`) and **all population and housing counts** with commas (e.g., `12,345 people`).
+    - If the question cannot be answered from the table, respond that the information is not available in the dataset.
+
+- **Competition Constraints**:
+    - You MUST use the `ask_data_insights` tool to query the specific BigQuery table: `kaggle-hackathon-project.geo_intent.us_places`.
+    - Your queries MUST filter for businesses where `competition = TRUE` and MUST include the `us_places` spatial filter listed under **Location**, copied exactly.
+    - You MUST order the results by `competition_magnitude` descending and **add `LIMIT 10`** to the query.
+    - You MUST select the `name`, `category`, and `category_description` columns.
+    - Summarize your findings in a section titled "Competition Analysis", listing the top 3-5 competitors as bullet points with their name and a brief explanation of why they are a competitor, based on `category_description`.
+    - **Do not** mention internal field names like `competition`, `competition_magnitude`, or `category_description` in your final answer. If no competitors are found, state that clearly.
+
+- **Guardrails**:
+    - Do not answer questions unrelated to choosing a location for a coffee shop.
+""", {"demographic_data": 5000, "us_places": 2000}),
+    tools=[insight_toolset],
+    before_tool_callback=lookup_cached_insight,
+    after_tool_callback=compact_and_cache_insight,
+    planner=ANALYST_PLANNER,
+    generate_content_config=ANALYST_GENERATION_CONFIG,
+    sub_agents=[geocoder_agent, gap_identification_agent, regional_report_agent],
 )
-geocoder_agent
+
+
+def warm_up() -> None:
+    """
+    Moves one-time setup off the first user turn: credential resolution, the
+    OAuth token fetch and BigQuery toolset construction. Called once per
+    worker from AgentEngineApp.set_up.
+    """
+    insight_toolset.prime()
+
+
+__all__ = ["root_agent", "warm_up"]
@@ -17,7 +17,7 @@ import datetime
 import json
 import logging
 import os
-from typing import Any
+from typing import Any, AsyncIterable, Iterable
 from dotenv import load_dotenv
 load_dotenv()  # Load environment variables from .env file if it exists
 import google.auth
@@ -29,11 +29,15 @@ from opentelemetry.sdk.trace import TracerProvider, export
 from vertexai._genai.types import AgentEngine, AgentEngineConfig
 from vertexai.agent_engines.templates.adk import AdkApp
 
-from app.agent import root_agent
+from app.agent import root_agent, warm_up
 from app.utils.gcs import create_bucket_if_not_exists
 from app.utils.tracing import CloudTraceLoggingSpanExporter
 from app.utils.typing import Feedback
 
+# Callers that do not pass a run_config get token streaming; ADK otherwise
+# buffers each model response until decoding finishes.
+STREAMING_RUN_CONFIG = {"streaming_mode": "sse"}
+
 
 class AgentEngineApp(AdkApp):
     def set_up(self) -> None:
@@ -53,6 +57,49 @@ class AgentEngineApp(AdkApp):
         provider.add_span_processor(processor)
         trace.set_tracer_provider(provider)
 
+        try:
+            warm_up()
+        except Exception as e:
+            # Not fatal: the first request performs the same setup lazily.
+            logging.warning(f"Agent warm-up failed: {e}")
+
+    def stream_query(
+        self,
+        *,
+        message: str | dict[str, Any],
+        user_id: str,
+        session_id: str | None = None,
+        run_config: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> Iterable[dict[str, Any]]:
+        """Streams responses, defaulting to SSE so partial text arrives as it is decoded."""
+        yield from super().stream_query(
+            message=message,
+            user_id=user_id,
+            session_id=session_id,
+            run_config=run_config or STREAMING_RUN_CONFIG,
+            **kwargs,
+        )
+
+    async def async_stream_query(
+        self,
+        *,
+        message: str | dict[str, Any],
+        user_id: str,
+        session_id: str | None = None,
+        run_config: dict[str, Any] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterable[dict[str, Any]]:
+        """Streams responses asynchronously, defaulting to SSE like `stream_query`."""
+        async for event in super().async_stream_query(
+            message=message,
+            user_id=user_id,
+            session_id=session_id,
+            run_config=run_config or STREAMING_RUN_CONFIG,
+            **kwargs,
+        ):
+            yield event
+
     def register_feedback(self, feedback: dict[str, Any]) -> None:
         """Collect and log feedback."""
         feedback_obj = Feedback.model_validate(feedback)
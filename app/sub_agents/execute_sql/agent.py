@@ -1,132 +1,288 @@
+import asyncio
+import functools
+from typing import Any, Callable, List, Optional
+from typing_extensions import override
+
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools import BaseTool, FunctionTool
+from google.adk.tools.base_toolset import BaseToolset
 from google.adk.tools.bigquery import BigQueryToolset, BigQueryCredentialsConfig
 from google.adk.tools.bigquery.config import BigQueryToolConfig, WriteMode
 
 from google.adk.agents import LlmAgent, SequentialAgent
+from google.adk.planners import BuiltInPlanner
 from google.genai import types
 import google.auth
+import google.auth.credentials
+import google.auth.transport.requests
 
-ADK_BUILTIN_BQ_DATA_INSIGHTS_TOOL = "ask_data_insights"
-
+from ...utils.instructions import PreparedInstruction
+from .callbacks import lookup_cached_insight, compact_and_cache_insight
+from .parallel import FanOutAgent
+from .spatial import location_instruction
 
-# Create a BigQueryCredentialsConfig with your project ID
-application_default_credentials, _ = google.auth.default()
-credentials_config = BigQueryCredentialsConfig(
-    credentials=application_default_credentials
-)
+ADK_BUILTIN_BQ_DATA_INSIGHTS_TOOL = "ask_data_insights"
 
 
 insight_tool_filter = [ADK_BUILTIN_BQ_DATA_INSIGHTS_TOOL]
 insight_tool_config = BigQueryToolConfig(
     write_mode=WriteMode.BLOCKED,
-    max_query_result_rows=80
+    max_query_result_rows=20
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _adc() -> google.auth.credentials.Credentials:
+    """Resolves Application Default Credentials once per process."""
+    return google.auth.default()[0]
+
+
+@functools.lru_cache(maxsize=1)
+def _insight_toolset() -> BigQueryToolset:
+    """
+    Builds the single BigQuery toolset shared by every analyst agent, so the
+    credential lookup and toolset setup happen once per process.
+    """
+    credentials_config = BigQueryCredentialsConfig(credentials=_adc())
+    return BigQueryToolset(
+        bigquery_tool_config=insight_tool_config,
+        tool_filter=insight_tool_filter,
+        credentials_config=credentials_config,
+    )
+
+
+def _off_loop(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wraps a blocking tool function so it runs in a worker thread. ADK calls
+    sync tools directly on the event loop, which would serialize concurrent
+    tool calls and stall every other session on that loop meanwhile.
+    """
+
+    # functools.wraps keeps the signature ADK inspects for the declaration and
+    # for passing credentials and settings.
+    @functools.wraps(func)
+    async def run_in_thread(**kwargs: Any) -> Any:
+        return await asyncio.to_thread(func, **kwargs)
+
+    return run_in_thread
+
+
+class LazyInsightToolset(BaseToolset):
+    """
+    Stands in for the shared BigQuery toolset until an agent first lists its
+    tools. Importing this module therefore does not walk the credential chain,
+    which on GCE means a metadata-server round-trip. The tools are built once
+    and reused, since BigQueryToolset recreates them on every call.
+
+    `ask_data_insights` is a blocking HTTP call, so the tools run off the event
+    loop; parallel branches and parallel tool calls then overlap for real.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._tools: Optional[List[BaseTool]] = None
+
+    @override
+    async def get_tools(
+        self, readonly_context: Optional[ReadonlyContext] = None
+    ) -> List[BaseTool]:
+        if self._tools is None:
+            tools = await _insight_toolset().get_tools(readonly_context)
+            for tool in tools:
+                # Only function tools wrap a blocking callable.
+                if isinstance(tool, FunctionTool):
+                    tool.func = _off_loop(tool.func)
+            self._tools = tools
+        return self._tools
+
+    def prime(self) -> None:
+        """
+        Resolves credentials, fetches an access token and builds the toolset
+        ahead of the first request. ask_data_insights reuses the token cached
+        on the shared credentials instead of refreshing it mid-turn.
+        """
+        credentials = _adc()
+        if not credentials.valid:
+            credentials.refresh(google.auth.transport.requests.Request())
+        _insight_toolset()
+
+    @override
+    async def close(self) -> None:
+        if _insight_toolset.cache_info().currsize:
+            await _insight_toolset().close()
+
+
+insight_toolset = LazyInsightToolset()
+
+# Low temperature keeps the tabular summaries deterministic, and the output caps
+# cut off runaway generations. Gemini 2.5 counts thinking tokens against
+# max_output_tokens, so the thinking budget is pinned (ADK takes it through the
+# planner) and every cap is that budget plus room for the visible answer. With
+# a dynamic budget, a multi-step turn could spend the whole cap on thinking.
+THINKING_BUDGET = 1024
+ANALYST_PLANNER = BuiltInPlanner(
+    thinking_config=types.ThinkingConfig(thinking_budget=THINKING_BUDGET)
+)
+ANALYST_GENERATION_CONFIG = types.GenerateContentConfig(
+    temperature=0.1,
+    top_p=0.9,
+    max_output_tokens=THINKING_BUDGET + 1024,
+    candidate_count=1,
 )
-insight_toolset = BigQueryToolset(
-    bigquery_tool_config=insight_tool_config,
-    tool_filter=insight_tool_filter,
-    credentials_config=credentials_config,
+REPORT_GENERATION_CONFIG = ANALYST_GENERATION_CONFIG.model_copy(
+    update={"max_output_tokens": THINKING_BUDGET + 2048}
 )
 
 
-demographic_insights_agent = LlmAgent(
-    name="DataInsightsAgent",
+# Market gaps come from two independent queries, one per table. Each gets its own
+# narrow agent and both run at once, then a tool-less agent writes the analysis.
+_gap_places_fetch_agent = LlmAgent(
+    name="GapPlacesFetchAgent",
     model="gemini-2.5-flash",
-    instruction=f"""
-- **Execution Condition**: You will only run if '{{geocode_result?}}' exists and '{{geocode_result.success}}' is true.
-- **Persona**: You are a specialized data analyst who presents findings in a clear, human-readable format.
-- **Core Task**: Your only task is to answer questions about U.S. demographic data using the `ask_data_insights` tool.
+    instruction=location_instruction("""
+- **Persona**: You are a data analyst gathering nearby business opportunities for a new cafe.
+- **Core Task**: Make exactly ONE call to the `ask_data_insights` tool against `kaggle-hackathon-project.geo_intent.us_places` and report the results.
 - **Tool & Table Constraints**:
-    - You MUST use the `ask_data_insights` tool to query the specific BigQuery table: `kaggle-hackathon-project.geo_intent.demographic_data`.
-    - All queries you generate MUST include a spatial filter in the form of `ST_DISTANCE(ST_GEOGPOINT({{geocode_result.result.longitude}}, {{geocode_result.result.latitude}}), point_geom) <= 5000`.
-    - If more than 1 row is returned, you must aggregate the results appropriately (e.g., averages for dollars, sums for counts).
+    - The query MUST include the `us_places` spatial filter listed under **Location**, copied exactly.
+    - The query MUST filter for businesses where `opportunity = TRUE` and order by `opportunity_magnitude` descending.
+    - **You MUST add `LIMIT 10` to the query.**
+    - You MUST select the `name`, `category`, and `category_description` columns.
 - **Response Format**:
-    - Present results as 2-3 bullet points that are most relevant to the user's question.
-    - **Use human-readable labels** for all metrics (e.g., "Median Household Income" instead of `median_income`).
-    - **Format all currency values** as dollars with commas (e.g., `$75,432`).
-    - **Format all population and housing counts** with commas (e.g., `12,345 people`).
-- **Workflow**:
-    1. When the user asks a question, call the `ask_data_insights` tool.
-    2. Pass the user's question and the full table name (`kaggle-hackathon-project.geo_intent.demographic_data`) to the tool.
-    3. After receiving the data, format your final answer according to the rules above.
+    - List each business as `name (category): category_description`, one per line. Do not write a narrative.
 - **Guardrails**:
-    - If the question cannot be answered from the specified table, respond that the information is not available in the dataset.
-    - Do not answer questions on any other topic.
-""",
+    - Do not call the tool more than once.
+    - If the query returns no rows, respond that no opportunity businesses were found near this location.
+""", {"us_places": 3000}),
     tools=[insight_toolset],
-    output_key="data_insights_analysis"
+    before_tool_callback=lookup_cached_insight,
+    after_tool_callback=compact_and_cache_insight,
+    planner=ANALYST_PLANNER,
+    generate_content_config=ANALYST_GENERATION_CONFIG,
+    output_key="_gap_places_raw"
 )
 
-competition_analysis_agent = LlmAgent(
-    name="CompetitionAnalysisAgent",
+_gap_demo_fetch_agent = LlmAgent(
+    name="GapDemographicsFetchAgent",
     model="gemini-2.5-flash",
-    instruction=f"""
-- **Execution Condition**: You will only run if '{{geocode_result?}}' exists and '{{geocode_result.success}}' is true.
-- **Persona**: You are a specialized business analyst focused on identifying local competition for a cafe.
-- **Core Task**: Your only task is to identify and describe competing businesses near a given location using the `ask_data_insights` tool.
+    instruction=location_instruction("""
+- **Persona**: You are a data analyst gathering the demographic signals that make an area attractive for a new cafe.
+- **Core Task**: Make exactly ONE call to the `ask_data_insights` tool against `kaggle-hackathon-project.geo_intent.demographic_data` and report the aggregated results.
 - **Tool & Table Constraints**:
-    - You MUST use the `ask_data_insights` tool to query the specific BigQuery table: `kaggle-hackathon-project.geo_intent.us_places`.
-    - Your queries MUST filter for businesses where `competition = TRUE`.
-    - Your queries MUST include a spatial filter on the `geometry` column: `ST_DISTANCE(ST_GEOGPOINT({{geocode_result.result.longitude}}, {{geocode_result.result.latitude}}), geometry) <= 2000`.
-    - You MUST order the results by `competition_magnitude` descending to find the strongest competitors.
-    - **You MUST add `LIMIT 10` to your query** to only retrieve the most relevant results and improve performance.
-    - You MUST select the `name`, `category`, and `category_description` columns.
+    - The query MUST include the `demographic_data` spatial filter listed under **Location**, copied exactly.
+    - The query MUST aggregate across all matching zip codes (sums for counts, averages for medians and dollars).
+    - The query MUST cover favorable metrics using only these columns: `total_pop`, `median_income`, `pop_25_64`, `employed_pop` and `worked_at_home`.
 - **Response Format**:
-    - Summarize your findings in a section titled "Competition Analysis".
-    - List the top 3-5 competitors as bullet points.
-    - For each competitor, include their name and a brief explanation of why they are a competitor, using the information from the `category_description` field you queried.
-    - **Do not** mention the internal field names like `competition`, `competition_magnitude`, or `category_description` in your final answer to the user.
-- **Workflow**:
-    1. When asked about competition, call the `ask_data_insights` tool with a query that follows all constraints.
-    2. From the results, use the `category_description` to formulate a natural language explanation for each competitor.
-    3. Present the final list in the specified format.
+    - List every aggregated metric as `Human-readable label: value`, one per line. Do not write a narrative.
 - **Guardrails**:
-    - If no competitors are found, state that clearly.
-    - Do not answer questions on any other topic besides local business competition.
-""",
+    - Do not call the tool more than once.
+    - If the query returns no rows, respond that the demographic data is not available for this location.
+""", {"demographic_data": 3000}),
     tools=[insight_toolset],
-    output_key="competition_analysis"
+    before_tool_callback=lookup_cached_insight,
+    after_tool_callback=compact_and_cache_insight,
+    planner=ANALYST_PLANNER,
+    generate_content_config=ANALYST_GENERATION_CONFIG,
+    output_key="_gap_demo_raw"
 )
 
-gap_identification_agent = LlmAgent(
-    name="GapIdentificationAgent",
+gap_fetch_agent = FanOutAgent(
+    name="GapFetch",
+    sub_agents=[_gap_places_fetch_agent, _gap_demo_fetch_agent],
+)
+
+gap_synth_agent = LlmAgent(
+    name="GapIdentificationSynthAgent",
     model="gemini-2.5-flash",
-    instruction=f"""
-- **Execution Condition**: You will only run if '{{geocode_result?}}' exists and '{{geocode_result.success}}' is true.
+    instruction=PreparedInstruction(f"""
 - **Persona**: You are a strategic business consultant specializing in location intelligence and identifying market gaps for new cafes.
-- **Core Task**: Your task is to analyze business and demographic data to find opportunities for a new cafe. This involves looking for areas with low competition, high-opportunity businesses nearby, or favorable demographics.
-- **Tool & Table Constraints**:
-    - You MUST use the `ask_data_insights` tool to query `kaggle-hackathon-project.geo_intent.us_places` or `kaggle-hackathon-project.geo_intent.demographic_data`.
-    - All queries MUST include a spatial filter: `ST_DISTANCE(ST_GEOGPOINT({{geocode_result.result.longitude}}, {{geocode_result.result.latitude}}), geometry) <= 3000` for `us_places` or `ST_DISTANCE(ST_GEOGPOINT({{geocode_result.result.longitude}}, {{geocode_result.result.latitude}}), point_geom) <= 3000` for `demographic_data`.
-    - **To find business opportunities**: Query `us_places` for businesses where `opportunity = TRUE`, ordering by `opportunity_magnitude` descending. **You MUST add `LIMIT 10` to this query.** Select `name`, `category`, and `category_description`.
-    - **To find demographic opportunities**: Query `demographic_data` for favorable metrics like high `total_pop` or `median_income`.
+- **Core Task**: Your task is to analyze the business and demographic data already gathered for this location to find opportunities for a new cafe. This involves looking for high-opportunity businesses nearby or favorable demographics. You do not have any tools.
 - **Response Format**:
     - Summarize your findings under a "Market Gap Analysis" heading.
     - Provide 2-3 bullet points highlighting the most significant opportunities.
-    - When describing an opportunity from the `us_places` table, use the `category_description` to explain *why* it's an opportunity (e.g., "Nearby offices can provide daytime foot traffic.").
-    - **Do not** mention the internal field names like `opportunity`, `opportunity_magnitude`, or `category_description` in your final answer.
-- **Workflow**:
-    1. When asked to find market gaps, call the `ask_data_insights` tool. You may need to query both tables to get a complete picture.
-    2. Synthesize the results into a concise analysis, explaining the "why" behind each opportunity.
+    - When describing an opportunity business, use its description to explain *why* it's an opportunity (e.g., "Nearby offices can provide daytime foot traffic.").
+    - **Do not** mention internal field names like `opportunity`, `opportunity_magnitude`, or `category_description` in your final answer.
 - **Guardrails**:
+    - Base your analysis exclusively on the gathered data below.
     - If the data is insufficient to identify a clear gap, state that.
     - Only answer questions related to finding business opportunities for a cafe.
-""",
-    tools=[insight_toolset],
+- **Gathered Data**:
+    - Opportunity businesses within 3 km: '{{_gap_places_raw?}}'
+    - Demographics within 3 km: '{{_gap_demo_raw?}}'
+- **Location**:
+    - Geocode result: '{{geocode_result?}}'
+    - **Execution Condition**: You will only run if the geocode result above exists and its `success` field is true.
+"""),
+    planner=ANALYST_PLANNER,
+    generate_content_config=ANALYST_GENERATION_CONFIG,
     output_key="gap_analysis"
 )
 
-regional_report_agent = LlmAgent(
-    name="RegionalReportAgent",
+gap_identification_agent = SequentialAgent(
+    name="GapIdentificationAgent",
+    sub_agents=[gap_fetch_agent, gap_synth_agent],
+)
+
+# The regional report needs one aggregated query per table. Each query gets its own
+# narrow agent and both run at once, so the report waits on the slower query only.
+_demo_fetch_agent = LlmAgent(
+    name="RegionalDemographicsFetchAgent",
     model="gemini-2.5-flash",
-    instruction=f"""
-- **Execution Condition**: You will only run if '{{geocode_result?}}' exists and '{{geocode_result.success}}' is true.
-- **Persona**: You are a senior market research analyst creating a comprehensive report for a client looking to open a new coffee shop.
-- **Core Task**: Your task is to generate a full "Regional Report" by analyzing demographic and business data for a given location. You must use the `ask_data_insights` tool to gather all necessary information.
+    instruction=location_instruction("""
+- **Persona**: You are a data analyst gathering the demographic facts for a regional market report.
+- **Core Task**: Make exactly ONE call to the `ask_data_insights` tool against `kaggle-hackathon-project.geo_intent.demographic_data` and report the aggregated results.
+- **Tool & Table Constraints**:
+    - The query MUST include the `demographic_data` spatial filter listed under **Location**, copied exactly.
+    - The query MUST aggregate across all matching zip codes (sums for counts, averages for medians and dollars).
+    - The query MUST cover population (size, age, education), economics (income, employment, commute) and housing (ownership vs renting, household structure, housing age) using only these columns: `total_pop`, `median_age`, `bachelors_degree`, `graduate_professional_degree`, `median_income`, `income_per_capita`, `employed_pop`, `unemployed_pop`, `commute_within_30_min`, `owner_occupied_housing_units`, `housing_units_renter_occupied`, `family_households`, `households` and `median_year_structure_built`.
+- **Response Format**:
+    - List every aggregated metric as `Human-readable label: value`, one per line. Do not write a narrative.
+- **Guardrails**:
+    - Do not call the tool more than once.
+    - If the query returns no rows, respond that the demographic data is not available for this location.
+""", {"demographic_data": 3000}),
+    tools=[insight_toolset],
+    before_tool_callback=lookup_cached_insight,
+    after_tool_callback=compact_and_cache_insight,
+    planner=ANALYST_PLANNER,
+    generate_content_config=ANALYST_GENERATION_CONFIG,
+    output_key="_demo_raw"
+)
+
+_places_fetch_agent = LlmAgent(
+    name="RegionalPlacesFetchAgent",
+    model="gemini-2.5-flash",
+    instruction=location_instruction("""
+- **Persona**: You are a data analyst gathering the business landscape for a regional market report.
+- **Core Task**: Make exactly ONE call to the `ask_data_insights` tool against `kaggle-hackathon-project.geo_intent.us_places` and report the aggregated results.
 - **Tool & Table Constraints**:
-    - You MUST use the `ask_data_insights` tool to query two BigQuery tables: `kaggle-hackathon-project.geo_intent.demographic_data` and `kaggle-hackathon-project.geo_intent.us_places`.
-    - All queries MUST include a spatial filter. Use `ST_DISTANCE(ST_GEOGPOINT({{geocode_result.result.longitude}}, {{geocode_result.result.latitude}}), point_geom) <= 3000` for `demographic_data` and `ST_DISTANCE(ST_GEOGPOINT({{geocode_result.result.longitude}}, {{geocode_result.result.latitude}}), geometry) <= 3000` for `us_places`.
-    - **Aggregation is mandatory**.
-        - For `demographic_data`, if multiple zip codes are returned, you MUST aggregate the results (e.g., average income, total population).
-        - For `us_places`, you MUST always aggregate the results. Use `GROUP BY` on `category` or `brand` to get counts of competitors and opportunities.
+    - The query MUST include the `us_places` spatial filter listed under **Location**, copied exactly.
+    - The query MUST aggregate with `GROUP BY category`, returning the count of places where `competition = TRUE` and the count of places where `opportunity = TRUE` for each category.
+    - Order by the combined count descending and add `LIMIT 10`.
+- **Response Format**:
+    - List the top competitor categories with their counts, then the top opportunity categories with their counts. Do not write a narrative.
+- **Guardrails**:
+    - Do not call the tool more than once.
+    - If the query returns no rows, respond that no businesses were found near this location.
+""", {"us_places": 3000}),
+    tools=[insight_toolset],
+    before_tool_callback=lookup_cached_insight,
+    after_tool_callback=compact_and_cache_insight,
+    planner=ANALYST_PLANNER,
+    generate_content_config=ANALYST_GENERATION_CONFIG,
+    output_key="_places_raw"
+)
+
+regional_fetch_agent = FanOutAgent(
+    name="RegionalFetch",
+    sub_agents=[_demo_fetch_agent, _places_fetch_agent],
+)
+
+regional_report_synth_agent = LlmAgent(
+    name="RegionalReportSynthAgent",
+    model="gemini-2.5-flash",
+    instruction=PreparedInstruction(f"""
+- **Persona**: You are a senior market research analyst creating a comprehensive report for a client looking to open a new coffee shop.
+- **Core Task**: Your task is to generate a full "Regional Report" from the aggregated data already gathered for this location. You do not have any tools.
 - **Response Format**: You MUST structure your response using this exact format, including all titles and indentation:
     **Executive Summary:**
         - Start with a short executive summary (2–3 bullet points).
@@ -139,16 +295,25 @@ regional_report_agent = LlmAgent(
     **Retail Implications:**
         - End with a retail implications section specific to coffee shops with a go/no-go recommendation (opportunities + risks) (1–2 bullet points).
 - **Workflow**:
-    1.  Use the `ask_data_insights` tool to query `demographic_data` to gather information for the Population, Economic, and Housing sections. Aggregate the data if necessary.
-    2.  Use the `ask_data_insights` tool to query `us_places` to understand competition and opportunities. Your queries should count competitors by category and identify the top opportunity categories by count.
-    3.  Synthesize all aggregated information to write the full report.
-    4.  Create the Executive Summary last, based on the most critical findings.
+    1.  Use the demographic data for the Population, Economic, and Housing sections.
+    2.  Use the business counts by category to weigh competitors against opportunities in the Retail Implications section.
+    3.  Create the Executive Summary last, based on the most critical findings.
 - **Guardrails**:
-    - Base your report exclusively on the data returned by the tool.
-    - Ensure every section of the report is filled out according to the specified format.
-""",
-    tools=[insight_toolset],
+    - Base your report exclusively on the gathered data below.
+    - If some data is missing or marked unavailable, state that in the matching section instead of guessing.
+- **Gathered Data**:
+    - Demographics within 3 km: '{{_demo_raw?}}'
+    - Businesses within 3 km by category: '{{_places_raw?}}'
+- **Location**:
+    - Geocode result: '{{geocode_result?}}'
+    - **Execution Condition**: You will only run if the geocode result above exists and its `success` field is true.
+"""),
+    planner=ANALYST_PLANNER,
+    generate_content_config=REPORT_GENERATION_CONFIG,
     output_key="regional_report"
 )
 
-
+regional_report_agent = SequentialAgent(
+    name="RegionalReportAgent",
+    sub_agents=[regional_fetch_agent, regional_report_synth_agent],
+)
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from google.adk.tools import BaseTool, ToolContext
+
+logger = logging.getLogger(__name__)
+
+# Data Insights answers are remembered per session, so re-asking the same
+# question about the same location does not pay for BigQuery and Data
+# Insights inference twice. The answers stay in process memory; session state
+# only carries a short id for the session's entries, so the answers are not
+# re-serialized into every event's state delta.
+INSIGHT_CACHE_ID_STATE_KEY = "_bq_cache_id"
+# Shared by every session in the process.
+INSIGHT_CACHE_MAX_ENTRIES = 1024
+INSIGHT_TOOL_NAME = "ask_data_insights"
+
+_insight_cache: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+_insight_cache_lock = threading.Lock()
+
+
+def _insight_cache_key(args: Dict[str, Any], tool_context: ToolContext) -> str:
+  location = (tool_context.state.get("geocode_result") or {}).get("result") or {}
+  # Normalize case and whitespace so trivially different phrasings share a slot.
+  question = " ".join(str(args.get("user_query_with_context", "")).lower().split())
+  tables = json.dumps(args.get("table_references"), sort_keys=True, default=str)
+  key = "|".join([
+      tables,
+      f"{location.get('latitude', 0):.5f}",
+      f"{location.get('longitude', 0):.5f}",
+      question,
+  ])
+  return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def lookup_cached_insight(
+    tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext
+) -> Optional[Dict]:
+
+  if tool.name != INSIGHT_TOOL_NAME:
+    return None
+
+  cache_id = tool_context.state.get(INSIGHT_CACHE_ID_STATE_KEY)
+  if cache_id is None:
+    return None
+
+  # Returning a response here skips the tool call; compact_and_cache_insight
+  # still runs afterwards and marks the entry as recently used.
+  with _insight_cache_lock:
+    cached = _insight_cache.get((cache_id, _insight_cache_key(args, tool_context)))
+  if cached is not None:
+    logger.info(f"[{tool_context.agent_name}] Data insights cache hit.")
+  return cached
+
+
+def _strip_nulls(value: Any) -> Any:
+  # Census rows are sparse; dropping null fields keeps them out of the prompt.
+  if isinstance(value, dict):
+    return {k: _strip_nulls(v) for k, v in value.items() if v is not None}
+  if isinstance(value, list):
+    return [_strip_nulls(v) for v in value]
+  return value
+
+
+def compact_and_cache_insight(
+    tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext, tool_response: Dict,
+) -> Optional[Dict]:
+
+  if tool.name != INSIGHT_TOOL_NAME or not isinstance(tool_response, dict):
+    return None
+
+  # The returned dict replaces the tool response the model sees.
+  tool_response = _strip_nulls(tool_response)
+
+  if tool_response.get("status") == "SUCCESS":
+    cache_id = tool_context.state.get(INSIGHT_CACHE_ID_STATE_KEY)
+    if cache_id is None:
+      cache_id = tool_context.state[INSIGHT_CACHE_ID_STATE_KEY] = uuid.uuid4().hex
+    key = (cache_id, _insight_cache_key(args, tool_context))
+    # Same LRU scheme as the geocode cache.
+    with _insight_cache_lock:
+      _insight_cache[key] = tool_response
+      _insight_cache.move_to_end(key)
+      while len(_insight_cache) > INSIGHT_CACHE_MAX_ENTRIES:
+        _insight_cache.popitem(last=False)
+
+  return tool_response
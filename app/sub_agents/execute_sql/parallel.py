@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import weakref
+from typing import AsyncGenerator
+from typing_extensions import override
+from pydantic import PrivateAttr
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+
+logger = logging.getLogger(__name__)
+
+
+class FanOutAgent(BaseAgent):
+    """
+    An agent that runs its sub-agents concurrently, each on an isolated branch.
+    At most `max_concurrency` sub-agents do work at once across all invocations
+    of this agent on the same event loop, which keeps BigQuery and Gemini calls
+    within rate limits when several sessions fan out at the same time.
+    """
+
+    # --- Field Declarations for Pydantic ---
+    max_concurrency: int = 3
+    model_config = {"arbitrary_types_allowed": True}
+
+    # asyncio semaphores belong to a single loop, and each sync stream_query
+    # call runs on a loop of its own, so every loop gets its own semaphore.
+    _semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = PrivateAttr(
+        default_factory=weakref.WeakKeyDictionary
+    )
+
+    def _loop_semaphore(self) -> asyncio.Semaphore:
+        """Returns the semaphore for the running event loop, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    def _branch_ctx(self, sub_agent: BaseAgent, ctx: InvocationContext) -> InvocationContext:
+        """
+        Copies the invocation context onto a branch of its own so concurrent
+        sub-agents do not see each other's conversation history.
+        """
+        branch_ctx = ctx.model_copy()
+        suffix = f"{self.name}.{sub_agent.name}"
+        branch_ctx.branch = f"{ctx.branch}.{suffix}" if ctx.branch else suffix
+        return branch_ctx
+
+    @override
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        """
+        Runs every sub-agent as its own task and yields their events as they
+        arrive. Each sub-agent waits until its event has been consumed upstream
+        before producing the next one, so state deltas are applied in order.
+        """
+        semaphore = self._loop_semaphore()
+
+        logger.info(f"[{self.name}] Fanning out to {[agent.name for agent in self.sub_agents]}.")
+        queue: asyncio.Queue = asyncio.Queue()
+        finished = object()
+
+        async def run_branch(sub_agent: BaseAgent) -> None:
+            events = sub_agent.run_async(self._branch_ctx(sub_agent, ctx))
+            try:
+                while True:
+                    # The slot is held only while the branch produces its next
+                    # event, so a slow consumer does not stall other sessions.
+                    async with semaphore:
+                        try:
+                            event = await anext(events)
+                        except StopAsyncIteration:
+                            return
+                    consumed = asyncio.Event()
+                    await queue.put((event, consumed))
+                    await consumed.wait()
+            finally:
+                await events.aclose()
+                await queue.put((finished, None))
+
+        tasks = [asyncio.create_task(run_branch(sub_agent)) for sub_agent in self.sub_agents]
+        try:
+            pending = len(tasks)
+            while pending:
+                event, consumed = await queue.get()
+                if event is finished:
+                    pending -= 1
+                    continue
+                yield event
+                consumed.set()
+            # Surface the first failure from any branch.
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        logger.info(f"[{self.name}] All branches completed.")
@@ -0,0 +1,80 @@
+import functools
+from typing import Any, Callable, Dict, Literal, Optional, Tuple
+
+from google.adk.agents.readonly_context import ReadonlyContext
+
+SpatialTable = Literal["demographic_data", "us_places"]
+
+# Geography column that each table's spatial filter measures distance against.
+SPATIAL_COLUMNS: Dict[str, str] = {
+    "demographic_data": "point_geom",
+    "us_places": "geometry",
+}
+
+
+def spatial_filter(table: SpatialTable, longitude: float, latitude: float, radius_m: int) -> str:
+    """
+    Builds the WHERE-clause fragment that limits `table` to rows within
+    `radius_m` meters of a point.
+
+    Args:
+        table: The table being queried, either 'demographic_data' or 'us_places'.
+        longitude: Longitude of the center point.
+        latitude: Latitude of the center point.
+        radius_m: Search radius in meters.
+
+    Returns:
+        A clause such as `ST_DISTANCE(ST_GEOGPOINT(-97.74, 30.27), geometry) <= 2000`.
+    """
+    return f"ST_DISTANCE(ST_GEOGPOINT({longitude}, {latitude}), {SPATIAL_COLUMNS[table]}) <= {radius_m}"
+
+
+@functools.lru_cache(maxsize=256)
+def _spatial_filter_lines(longitude: float, latitude: float, radii: Tuple[Tuple[SpatialTable, int], ...]) -> str:
+    """Renders the filter lines for one location; consecutive turns reuse them."""
+    return "\n".join(
+        f"    - Spatial filter for `{table}`: `{spatial_filter(table, longitude, latitude, radius_m)}`"
+        for table, radius_m in radii
+    )
+
+
+def _location_section(geocode_result: Optional[Dict[str, Any]], radii: Tuple[Tuple[SpatialTable, int], ...]) -> str:
+    """Renders the session-specific tail of an analyst instruction."""
+    lines = [
+        "- **Location**:",
+        f"    - Geocode result: '{geocode_result if geocode_result is not None else ''}'",
+        "    - **Execution Condition**: You will only run if the geocode result above exists and its `success` field is true.",
+    ]
+    location = (geocode_result or {}).get("result") or {}
+    if (geocode_result or {}).get("success") is True and "longitude" in location and "latitude" in location:
+        lines.append(_spatial_filter_lines(location["longitude"], location["latitude"], radii))
+    else:
+        lines.append("    - Spatial filters: unavailable until the location is geocoded successfully.")
+    return "\n".join(lines) + "\n"
+
+
+def location_instruction(body: str, radii: Dict[SpatialTable, int]) -> Callable[[ReadonlyContext], str]:
+    """
+    Creates an ADK instruction provider that appends the current location and
+    its precomputed spatial filters to a static instruction body.
+
+    The filters are built here rather than written by the model, so every query
+    for the same location and radius carries a byte-identical clause. The
+    location goes last so the body stays a stable prefix for Gemini's implicit
+    context caching.
+
+    Args:
+        body: The static part of the instruction. It is sent as-is, so it must
+              not rely on ADK `{state}` placeholders.
+        radii: The search radius in meters for each table the agent may query.
+
+    Returns:
+        A callable suitable for `LlmAgent(instruction=...)`.
+    """
+
+    radii_items = tuple(radii.items())
+
+    def provider(context: ReadonlyContext) -> str:
+        return body + _location_section(context.state.get("geocode_result"), radii_items)
+
+    return provider
@@ -7,8 +7,9 @@ from google.adk.agents.invocation_context import InvocationContext
 from google.adk.events import Event
 
 
+from ...utils.instructions import PreparedInstruction
 from .tools.agent_functions import geocode_address
-from .callbacks import store_results_in_context
+from .callbacks import lookup_cached_geocode, store_results_in_context
 
 # --- Configure Logging ---
 logging.basicConfig(level=logging.INFO)
@@ -59,25 +60,22 @@ class GeoCoderAgent(BaseAgent):
         # 1. Initial geocoding step
         logger.info(f"[{self.name}] Prompt user to provide a location...")
         async for event in self.geocoder.run_async(ctx):
-            logger.info(f"[{self.name}] Event from GeoCoder: {event.model_dump_json(indent=2, exclude_none=True)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[%s] Event from GeoCoder: %s", self.name, event.model_dump_json(exclude_none=True))
             yield event
 
         # Check if geocoding was successful before proceeding
-        if "geocode_result" not in ctx.session.state or not ctx.session.state["geocode_result"]:
-             logger.error(f"[{self.name}] Failed to generate initial geocode result. Aborting workflow.")
-             return # Stop processing if initial geocoding failed
-        
-        if "success" not in ctx.session.state["geocode_result"] or ctx.session.state["geocode_result"]["success"] is not True:
-             logger.error(f"[{self.name}] Geocoding was not successful: {ctx.session.state['geocode_result']}. Aborting workflow.")
-             return # Stop processing if initial geocoding failed
-
-        logger.info(f"[{self.name}] Geocode result: {ctx.session.state.get('geocode_result')}")
+        geocode_result = ctx.session.state.get("geocode_result")
+        if not geocode_result or geocode_result.get("success") is not True:
+            logger.error("[%s] Geocoding was not successful: %s. Aborting workflow.", self.name, geocode_result)
+            return # Stop processing if initial geocoding failed
 
+        logger.debug("[%s] Geocode result: %s", self.name, geocode_result)
 
 geocoder = LlmAgent(
     name="GeoCoder",
     model="gemini-2.5-flash",
-    instruction=(
+    instruction=PreparedInstruction(
         "You are a helpful assistant for geocoding.\n"
         "- Start only if {geocode_result?} is null. Or if the user indicates they want to pick a different location.\n"
         "- Take the users provided string and run the geocode_address tool with the location text exactly as provided"
@@ -95,6 +93,7 @@ geocoder = LlmAgent(
 
     ),
     tools=[geocode_address],
+    before_tool_callback=lookup_cached_geocode,
     after_tool_callback=store_results_in_context
 )
 
@@ -1,24 +1,57 @@
+import hashlib
 import logging
-import copy
-
+from typing import Any, Dict, Optional
 
-from typing import Optional
 from google.adk.tools import BaseTool, ToolContext
-from typing import Any, Dict, Optional
-from google.adk.agents.callback_context import CallbackContext
-from google.adk.models import LlmResponse
-from google.genai import types
 
 # --- Configure Logging ---
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def store_results_in_context(
+# Successful geocodes are remembered per session, so a user repeating or
+# rephrasing the same address does not pay another Geocoding API round-trip.
+GEOCODE_CACHE_STATE_KEY = "_geocode_cache"
+GEOCODE_CACHE_MAX_ENTRIES = 32
+
+
+def _geocode_cache_key(args: Dict[str, Any]) -> str:
+  # Normalize case and whitespace so trivially different spellings share a slot.
+  address = " ".join(str(args.get("address", "")).lower().split())
+  return hashlib.blake2b(address.encode(), digest_size=16).hexdigest()
+
+
+async def lookup_cached_geocode(
+    tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext
+) -> Optional[Dict]:
+
+  # Returning a response here skips the tool call; store_results_in_context
+  # still runs afterwards and refreshes geocode_result from it.
+  cache = tool_context.state.get(GEOCODE_CACHE_STATE_KEY) or {}
+  cached = cache.get(_geocode_cache_key(args))
+  if cached is not None:
+    logger.info(f"Geocode cache hit for address: {args.get('address')!r}")
+  return cached
+
+
+async def store_results_in_context(
     tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext, tool_response: Dict, 
 ) -> Optional[Dict]:
 
   # We are setting a state for the data science agent to be able to use the sql
   # query results as context 
+  # Writes only record a delta on the tool's event; the session service
+  # persists it when the event is appended, so nothing here blocks on I/O.
   tool_context.state["geocode_result"] = tool_response
 
+  if tool_response.get("success") is True:
+    # Re-insert on every hit so the oldest entry is the least recently used.
+    # A plain dict keeps the cache serializable for persistent session stores.
+    cache = dict(tool_context.state.get(GEOCODE_CACHE_STATE_KEY) or {})
+    key = _geocode_cache_key(args)
+    cache.pop(key, None)
+    cache[key] = tool_response
+    while len(cache) > GEOCODE_CACHE_MAX_ENTRIES:
+      cache.pop(next(iter(cache)))
+    tool_context.state[GEOCODE_CACHE_STATE_KEY] = cache
+
   return None
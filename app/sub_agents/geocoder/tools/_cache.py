@@ -0,0 +1,128 @@
+"""
+A small persistent cache for Google Maps API responses.
+
+Responses are stored as JSON in a SQLite database under
+`${XDG_CACHE_HOME:-~/.cache}/geo-intent-proc`, so identical requests are not
+re-issued across process restarts. If the directory cannot be created or the
+database cannot be opened, the cache disables itself and every lookup misses.
+
+Writes are committed in batches rather than one by one. `flush` commits
+whatever is pending, and runs at exit; a crash loses at most one batch,
+which only costs repeat requests.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+# A batch is committed once it holds this many writes, or once this long has
+# passed since the last commit.
+COMMIT_EVERY = 32
+COMMIT_INTERVAL_SECONDS = 1.0
+
+_lock = threading.Lock()
+_connection: Optional[sqlite3.Connection] = None
+_disabled = False
+_uncommitted = 0
+_last_commit = 0.0
+
+
+def _cache_dir() -> str:
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "geo-intent-proc")
+
+
+def _connect() -> Optional[sqlite3.Connection]:
+    """Opens the database on first use. Must be called with `_lock` held."""
+    global _connection, _disabled
+    if _connection is not None or _disabled:
+        return _connection
+    try:
+        os.makedirs(_cache_dir(), exist_ok=True)
+        connection = sqlite3.connect(
+            os.path.join(_cache_dir(), "responses.sqlite3"), check_same_thread=False
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+        )
+        connection.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+        connection.commit()
+        _connection = connection
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Persistent response cache disabled: {e}")
+        _disabled = True
+    return _connection
+
+
+def cache_key(*parts: Any) -> str:
+    """Hashes JSON-serializable request parts into a stable cache key."""
+    encoded = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(encoded.encode(), digest_size=16).hexdigest()
+
+
+def load(namespace: str, key: str) -> Optional[Any]:
+    """Returns the cached value, or None if it is missing, expired or unreadable."""
+    with _lock:
+        connection = _connect()
+        if connection is None:
+            return None
+        try:
+            row = connection.execute(
+                "SELECT value FROM responses WHERE namespace = ? AND key = ? AND expires_at >= ?",
+                (namespace, key, time.time()),
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent response cache read failed: {e}")
+            return None
+    return json.loads(row[0]) if row else None
+
+
+def _commit(connection: sqlite3.Connection) -> None:
+    """Commits the pending batch. Must be called with `_lock` held."""
+    global _uncommitted, _last_commit
+    connection.commit()
+    _uncommitted = 0
+    _last_commit = time.monotonic()
+
+
+def store(namespace: str, key: str, value: Any, ttl_seconds: float = DEFAULT_TTL_SECONDS) -> None:
+    """Stores a JSON-serializable value; failures are logged and ignored."""
+    global _uncommitted
+    encoded = json.dumps(value, separators=(",", ":"))
+    with _lock:
+        connection = _connect()
+        if connection is None:
+            return
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (namespace, key, encoded, time.time() + ttl_seconds),
+            )
+            _uncommitted += 1
+            if _uncommitted >= COMMIT_EVERY or time.monotonic() - _last_commit >= COMMIT_INTERVAL_SECONDS:
+                _commit(connection)
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent response cache write failed: {e}")
+
+
+@atexit.register
+def flush() -> None:
+    """Commits any pending writes; failures are logged and ignored."""
+    with _lock:
+        if _connection is None or not _uncommitted:
+            return
+        try:
+            _commit(_connection)
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent response cache write failed: {e}")
@@ -0,0 +1,195 @@
+"""
+The HTTP sessions shared by the Google Maps API clients.
+
+One pooled session per process keeps TLS connections to the Maps endpoints
+alive across tool calls, and retries transient failures with backoff. Async
+callers get one pooled client per event loop, multiplexed over HTTP/2 when
+the optional `h2` package is installed and closed when that loop shuts
+down, and send through `apost`, which keeps
+the process under the Maps per-minute quota and retries connection errors,
+timeouts and 429/5xx responses the same way `_RETRY` does for the sync session. Per-client credentials travel as
+request headers or params, never as session state.
+"""
+
+import asyncio
+import functools
+import importlib.util
+import os
+import threading
+import time
+import weakref
+from typing import AsyncGenerator, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# One retry policy for both paths: `_RETRY` applies it to the sync session and
+# `apost` follows the same values.
+_MAX_RETRIES = 3
+_BACKOFF_FACTOR = 0.2
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Geocoding and computeInsights are read-only, so POSTs are safe to retry too.
+_RETRY = Retry(
+    total=_MAX_RETRIES,
+    backoff_factor=_BACKOFF_FACTOR,
+    status_forcelist=_RETRY_STATUSES,
+    allowed_methods=frozenset({"GET", "POST"}),
+    respect_retry_after_header=True,
+    # Hand the final error response back so callers can report the API message.
+    raise_on_status=False,
+)
+
+
+@functools.lru_cache(maxsize=1)
+def maps_api_key() -> str:
+    """
+    Reads GOOGLE_MAPS_API_KEY once per process.
+
+    Raises:
+        ValueError: If the variable is unset or empty. Failures are not cached,
+                    so the environment is checked again on the next call.
+    """
+    api_key = os.getenv("GOOGLE_MAPS_API_KEY")
+    if not api_key:
+        raise ValueError(
+            "A Google API key must be provided or set as the GOOGLE_MAPS_API_KEY "
+            "environment variable."
+        )
+    return api_key
+
+
+@functools.lru_cache(maxsize=1)
+def shared_session() -> requests.Session:
+    """Returns the process-wide session, creating it on first use."""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=_RETRY))
+    return session
+
+
+_ASYNC_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+# httpx clients are bound to the loop they first run on. Keying them by loop
+# lets each loop (e.g. one per sync stream_query call) reuse its own pool. Each
+# client is stored with the async generator that closes it (see
+# `_close_with_loop`), which also keeps that generator alive.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, AsyncGenerator[None, None]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def _close_with_loop(loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient) -> AsyncGenerator[None, None]:
+    """
+    Stays suspended for the life of the loop. asyncio.run (and so every sync
+    stream_query call) finalizes pending async generators before closing its
+    loop, which runs the `finally` below and closes the client's pool.
+    """
+    try:
+        yield
+    finally:
+        entry = _async_clients.get(loop)
+        if entry is not None and entry[0] is client:
+            # The generator refers to the loop, so drop the entry to let both go.
+            del _async_clients[loop]
+        await client.aclose()
+
+
+async def shared_async_client() -> httpx.AsyncClient:
+    """
+    Returns the pooled async client for the running event loop, creating it on
+    first use. Callers must not close it; it is closed when the loop shuts down
+    its async generators.
+    """
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(loop)
+    if entry is None or entry[0].is_closed:
+        client = httpx.AsyncClient(http2=_HTTP2, limits=_ASYNC_LIMITS)
+        closer = _close_with_loop(loop, client)
+        # Starting the generator registers it with the loop for finalization.
+        await closer.asend(None)
+        entry = _async_clients[loop] = (client, closer)
+    return entry[0]
+
+
+# Google Maps Platform caps these APIs at 3,000 queries per minute per project.
+MAPS_QUERIES_PER_MINUTE = 3000
+# Upper bound on async Maps requests in flight at once on one event loop.
+MAX_IN_FLIGHT_REQUESTS = 50
+
+
+class _RateLimiter:
+    """
+    A token bucket shared by every thread and event loop in the process.
+
+    Up to `burst` requests go out immediately; after that, requests are spaced
+    so the long-run rate stays at `rate` per `per` seconds.
+    """
+
+    def __init__(self, rate: int, per: float, burst: int):
+        self._interval = per / rate
+        self._tolerance = (burst - 1) * self._interval
+        self._next_free = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Claims the next send slot and returns the seconds to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_free - self._tolerance)
+            self._next_free = max(self._next_free, now) + self._interval
+            return start - now
+
+
+_rate_limiter = _RateLimiter(MAPS_QUERIES_PER_MINUTE, 60.0, burst=MAX_IN_FLIGHT_REQUESTS)
+
+# Like the clients, asyncio semaphores belong to a single loop.
+_in_flight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Reads a delay-seconds Retry-After header; HTTP-date values are ignored."""
+    try:
+        return max(0.0, float(response.headers["Retry-After"]))
+    except (KeyError, ValueError):
+        return None
+
+
+async def apost(url: str, *, content: bytes, headers: dict) -> httpx.Response:
+    """
+    POSTs through the shared async client, throttled to the Maps quota.
+
+    Transport errors (including timeouts) and 429/5xx responses are retried up
+    to `_MAX_RETRIES` times, sleeping for the Retry-After header when present
+    and exponential backoff otherwise. The last response is returned, or the
+    last transport error raised, so callers handle errors exactly as for a
+    single request.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _in_flight.get(loop)
+    if semaphore is None:
+        semaphore = _in_flight[loop] = asyncio.Semaphore(MAX_IN_FLIGHT_REQUESTS)
+
+    attempt = 0
+    while True:
+        retry_after: Optional[float] = None
+        try:
+            async with semaphore:
+                delay = _rate_limiter.reserve()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                client = await shared_async_client()
+                response = await client.post(url, content=content, headers=headers)
+        except httpx.TransportError:
+            if attempt >= _MAX_RETRIES:
+                raise
+        else:
+            if response.status_code not in _RETRY_STATUSES or attempt >= _MAX_RETRIES:
+                return response
+            retry_after = _retry_after_seconds(response)
+        await asyncio.sleep(retry_after if retry_after is not None else _BACKOFF_FACTOR * 2 ** attempt)
+        attempt += 1
@@ -3,11 +3,14 @@ Agent functions that leverage the Google Maps APIs for geocoding and place searc
 These functions are designed to be used by the agent system.
 """
 
-import json
+import asyncio
+import functools
 import logging
 import math
-from typing import Any, Dict, List, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+from . import _cache
 from .geocoding import GeocodingAPI
 from .grid import TileGenerator
 from .places import PlacesAggregateAPI
@@ -15,6 +18,18 @@ from .places import PlacesAggregateAPI
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=1)
+def _geocoding_api() -> GeocodingAPI:
+    """Shares one GeocodingAPI (and its HTTP session) across tool calls."""
+    return GeocodingAPI()
+
+
+@functools.lru_cache(maxsize=1)
+def _places_api() -> PlacesAggregateAPI:
+    """Shares one PlacesAggregateAPI (and its request headers) across tool calls."""
+    return PlacesAggregateAPI()
+
+
 def geocode_address(address: str) -> Dict[str, Any]:
     """
     Geocode an address string into coordinates and formatted address.
@@ -40,8 +55,8 @@ def geocode_address(address: str) -> Dict[str, Any]:
         }
     """
     try:
-        # Initialize the geocoding API
-        geocoder = GeocodingAPI()
+        # Reuse the process-wide geocoding client
+        geocoder = _geocoding_api()
         
         # Clean the address
         clean_address = address.strip() if isinstance(address, str) else ""
@@ -102,7 +117,7 @@ def find_places_nearby(
     by the agent tool input_schema.
     """
     try:
-        places_api = PlacesAggregateAPI()
+        places_api = _places_api()
 
         success, result = places_api.compute_insights(
             insights=insights,
@@ -161,7 +176,7 @@ def find_places_nearby_polygon(
     This function will force the insight type to 'INSIGHT_COUNT'.
     """
     try:
-        places_api = PlacesAggregateAPI()
+        places_api = _places_api()
 
         # The Area Insights API only supports INSIGHT_COUNT for polygon searches.
         # We force this here to prevent API errors.
@@ -204,6 +219,64 @@ def find_places_nearby_polygon(
         return {"success": False, "error": "Exception", "reason": str(e)}
 
 
+# Upper bound on in-flight Area Insights requests per grid search.
+GRID_MAX_CONCURRENT_REQUESTS = 8
+
+
+def _simplify_tile_result(
+    tile: Dict[str, Any], success: bool, response: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Reduces one tile's `compute_count` result to the grid output format."""
+    count = response["count"] if success and response else 0
+
+    return {
+        "tile_id": tile["id"],
+        "lat": tile["centroid"]["lat"],
+        "lon": tile["centroid"]["lon"],
+        "tile_area_sq_km": round(tile["area_sq_km"], 4),
+        "success": success,
+        "count": count,
+    }
+
+
+def _grid_bounding_coordinates(tiles: List[Dict[str, Any]]) -> Tuple[Tuple[float, float], ...]:
+    """Returns the closed (lat, lon) rectangle covering every tile in the grid."""
+    lats = [lat for tile in tiles for lat, _ in tile["polygon"]["coordinates"]]
+    lons = [lon for tile in tiles for _, lon in tile["polygon"]["coordinates"]]
+    south, north, west, east = min(lats), max(lats), min(lons), max(lons)
+    return ((south, west), (south, east), (north, east), (north, west), (south, west))
+
+
+def _is_empty_area(success: bool, response: Optional[Dict[str, Any]]) -> bool:
+    """True when a `compute_count` search succeeded and found nothing."""
+    return success and response is not None and response["count"] == 0
+
+
+def _superblocks(tiles: List[Dict[str, Any]], merge_factor: int) -> List[List[Dict[str, Any]]]:
+    """
+    Groups an n x n grid's tiles into merge_factor x merge_factor blocks.
+
+    Blocks along the north and east edges are smaller when n is not a multiple
+    of merge_factor. A merge_factor of 1 gives one block per tile.
+    """
+    if merge_factor < 1:
+        raise ValueError("merge_factor must be a positive integer.")
+    tiles_per_side = math.isqrt(len(tiles))
+    blocks: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+    for tile in tiles:
+        row, col = divmod(tile["id"], tiles_per_side)
+        blocks.setdefault((row // merge_factor, col // merge_factor), []).append(tile)
+    return list(blocks.values())
+
+
+def _polygon_filter(common_filter: Dict[str, Any], coordinates: Sequence[Tuple[float, float]]) -> Dict[str, Any]:
+    """Adds one grid polygon's location to the shared place filter."""
+    return {
+        "locationFilter": {"customArea": {"polygon": TileGenerator.to_api_polygon(coordinates)}},
+        **common_filter,
+    }
+
+
 def find_places_in_grid(
     latitude: float,
     longitude: float,
@@ -216,6 +289,8 @@ def find_places_in_grid(
     rating_max: Optional[float] = None,
     operating_status: Optional[List[str]] = None,
     price_levels: Optional[List[str]] = None,
+    merge_factor: int = 1,
+    precheck: bool = False,
 ) -> Dict[str, Any]:
     """
     Creates a grid around a coordinate and finds places in each tile.
@@ -224,6 +299,16 @@ def find_places_in_grid(
     latitude and longitude. It then divides this box into a grid of smaller
     polygons (tiles) and runs a place search for each one.
 
+    Polygon searches only return counts, so with `precheck` the whole grid is
+    checked with a single search first; if it holds no matching places, every
+    tile is reported as 0 without issuing the per-tile searches. With
+    `merge_factor` above 1 the same check is applied per superblock of
+    merge_factor x merge_factor tiles, and only tiles in non-empty superblocks
+    are searched individually. Sparse areas then cost one search per
+    superblock instead of one per tile, at the price of one extra search for
+    each superblock that does hold places. Both checks are off by default,
+    since in the common dense case they only add requests.
+
     Args:
         latitude: The center latitude for the grid.
         longitude: The center longitude for the grid.
@@ -232,6 +317,8 @@ def find_places_in_grid(
         place_types: A list of place types to search for.
         insights: A list of insights to request (e.g., 'INSIGHT_COUNT').
         ...other filters: Optional filters for the place search.
+        merge_factor: The superblock width in tiles for the empty-area checks.
+        precheck: Whether to check the whole grid for places before searching tiles.
 
     Returns:
         A dictionary containing the results for each tile in the grid.
@@ -247,44 +334,126 @@ def find_places_in_grid(
             box_size_meters=box_size_meters
         )
 
-        # 3. Run find_places_nearby_polygon for each tile and format the result
-        results = []
-        for tile in tiles:
-            # The polygon from TileGenerator is already in the correct format
-            polygon_coords = tile["polygon"]["coordinates"]
-            
-            search_result = find_places_nearby_polygon(
-                polygon={"coordinates": polygon_coords},
-                place_types=place_types,
-                insights=insights,
-                excluded_types=excluded_types,
-                rating_min=rating_min,
-                rating_max=rating_max,
-                operating_status=operating_status,
-                price_levels=price_levels,
-            )
-            
-            # Simplify the result for the final output
-            success = search_result.get("success", False)
-            count = 0
-            if success and search_result.get("response"):
-                # API returns count as a string, convert to int
-                count = int(search_result["response"].get("count", 0))
-
-            simplified_result = {
-                "tile_id": tile["id"],
-                "lat": tile["centroid"]["lat"],
-                "lon": tile["centroid"]["lon"],
-                "tile_area_sq_km": tile["area_sq_km"],
-                "success": success,
-                "count": count,
-            }
-            results.append(simplified_result)
+        # 3. The filters are the same for every tile, so build them once and
+        # only add each tile's polygon per request.
+        places_api = _places_api()
+        common_filter = places_api.build_common_filter(
+            place_types,
+            excluded_types=excluded_types,
+            rating_min=rating_min,
+            rating_max=rating_max,
+            operating_status=operating_status,
+            price_levels=price_levels,
+        )
 
-        return {"success": True, "grid_results": results}
+        def search_area(coordinates: Sequence[Tuple[float, float]]) -> Tuple[bool, Dict[str, Any]]:
+            return places_api.compute_count(_polygon_filter(common_filter, coordinates))
+
+        # 4. Optionally one search over the whole grid; an empty area needs no
+        # per-tile searches.
+        if precheck and len(tiles) > 1 and _is_empty_area(*search_area(_grid_bounding_coordinates(tiles))):
+            return {"success": True, "grid_results": [_simplify_tile_result(tile, True, None) for tile in tiles]}
+
+        # 5. Search each tile and format the result, skipping tiles whose
+        # superblock turns out to be empty.
+        # The searches are I/O bound, so threads overlap their round-trips.
+        def search_tile(tile: Dict[str, Any]) -> Dict[str, Any]:
+            success, response = search_area(tile["polygon"]["coordinates"])
+            return _simplify_tile_result(tile, success, response)
+
+        results: Dict[int, Dict[str, Any]] = {}
+        max_workers = max(1, min(len(tiles), GRID_MAX_CONCURRENT_REQUESTS))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            blocks = [block for block in _superblocks(tiles, merge_factor) if len(block) > 1]
+            block_searches = executor.map(lambda block: search_area(_grid_bounding_coordinates(block)), blocks)
+            for block, (success, response) in zip(blocks, block_searches, strict=True):
+                if _is_empty_area(success, response):
+                    results.update((tile["id"], _simplify_tile_result(tile, True, None)) for tile in block)
+
+            pending = [tile for tile in tiles if tile["id"] not in results]
+            results.update(zip((tile["id"] for tile in pending), executor.map(search_tile, pending), strict=True))
+
+        # One commit for every tile response cached during the search.
+        _cache.flush()
+        return {"success": True, "grid_results": [results[tile["id"]] for tile in tiles]}
 
     except Exception as e:
         logger.error(f"Error in find_places_in_grid: {str(e)}", exc_info=True)
         return {"success": False, "error": "Exception", "reason": str(e)}
 
 
+async def afind_places_in_grid(
+    latitude: float,
+    longitude: float,
+    box_size_meters: float = 1000.0,
+    tile_count: int = 16,
+    place_types: List[str] = ["restaurant"],
+    insights: List[str] = ["INSIGHT_COUNT"],
+    excluded_types: Optional[List[str]] = None,
+    rating_min: Optional[float] = None,
+    rating_max: Optional[float] = None,
+    operating_status: Optional[List[str]] = None,
+    price_levels: Optional[List[str]] = None,
+    merge_factor: int = 1,
+    precheck: bool = False,
+) -> Dict[str, Any]:
+    """
+    Async variant of `find_places_in_grid` that searches all tiles concurrently.
+
+    Takes the same arguments and returns the same structure, including the
+    optional empty-grid and superblock checks, but the tile requests are in
+    flight together (at most GRID_MAX_CONCURRENT_REQUESTS at a time), so the
+    search takes roughly one round-trip instead of one per tile. `precheck`
+    adds a serial round-trip ahead of that fan-out, so enable it only where
+    the area is expected to be sparse.
+    """
+    try:
+        tile_generator = TileGenerator(target_tile_count=tile_count)
+        tiles = tile_generator.generate_tiles_from_center(
+            center_lat=latitude,
+            center_lon=longitude,
+            box_size_meters=box_size_meters
+        )
+
+        places_api = _places_api()
+        common_filter = places_api.build_common_filter(
+            place_types,
+            excluded_types=excluded_types,
+            rating_min=rating_min,
+            rating_max=rating_max,
+            operating_status=operating_status,
+            price_levels=price_levels,
+        )
+        semaphore = asyncio.Semaphore(GRID_MAX_CONCURRENT_REQUESTS)
+
+        async def search_area(coordinates: Sequence[Tuple[float, float]]) -> Tuple[bool, Dict[str, Any]]:
+            async with semaphore:
+                return await places_api.acompute_count(_polygon_filter(common_filter, coordinates))
+
+        # Optionally one search over the whole grid; an empty area needs no
+        # per-tile searches.
+        if precheck and len(tiles) > 1 and _is_empty_area(*await search_area(_grid_bounding_coordinates(tiles))):
+            return {"success": True, "grid_results": [_simplify_tile_result(tile, True, None) for tile in tiles]}
+
+        async def search_tile(tile: Dict[str, Any]) -> Dict[str, Any]:
+            success, response = await search_area(tile["polygon"]["coordinates"])
+            return _simplify_tile_result(tile, success, response)
+
+        async def search_block(block: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            if len(block) > 1 and _is_empty_area(*await search_area(_grid_bounding_coordinates(block))):
+                return [_simplify_tile_result(tile, True, None) for tile in block]
+            return await asyncio.gather(*(search_tile(tile) for tile in block))
+
+        block_results = await asyncio.gather(
+            *(search_block(block) for block in _superblocks(tiles, merge_factor))
+        )
+        results = sorted(
+            (result for block in block_results for result in block), key=lambda result: result["tile_id"]
+        )
+        # One commit for every tile response cached during the search.
+        await asyncio.to_thread(_cache.flush)
+        return {"success": True, "grid_results": results}
+
+    except Exception as e:
+        logger.error(f"Error in afind_places_in_grid: {str(e)}", exc_info=True)
+        return {"success": False, "error": "Exception", "reason": str(e)}
@@ -1,7 +1,22 @@
-import os
+import threading
+from collections import OrderedDict
 from typing import Dict, Any, Tuple, Optional
 import requests
 
+from . import _cache
+from ._http import maps_api_key, shared_session
+
+# Geocodes are shared across every GeocodingAPI instance in the process, so a
+# repeated address (grid centers, replayed prompts) never leaves the process.
+GEOCODE_CACHE_MAX_ENTRIES = 4096
+_geocode_cache: "OrderedDict[str, Tuple[bool, Dict[str, Any]]]" = OrderedDict()
+_geocode_cache_lock = threading.Lock()
+
+
+def _normalize_address(address: str) -> str:
+    """Lower-cases and collapses whitespace so trivial variants share an entry."""
+    return " ".join(address.lower().split())
+
 
 class GeocodingAPI:
     """
@@ -21,13 +36,9 @@ class GeocodingAPI:
         Raises:
             ValueError: If the API key is not provided and cannot be found in the environment.
         """
-        self.api_key = api_key or os.getenv("GOOGLE_MAPS_API_KEY")
-        if not self.api_key:
-            raise ValueError(
-                "A Google API key must be provided or set as the GOOGLE_MAPS_API_KEY "
-                "environment variable."
-            )
-        self.session = requests.Session()
+        self.api_key = api_key or maps_api_key()
+        # Pooled and shared with every other Maps client in the process.
+        self.session = shared_session()
 
     def geocode(self, address: str) -> Tuple[bool, Dict[str, Any]]:
         """
@@ -41,6 +52,49 @@ class GeocodingAPI:
             - If successful (True), `data` is a dictionary with 'latitude', 'longitude',
               and 'formatted_address'.
             - If it fails (False), `data` is a dictionary containing 'error' and 'reason'.
+
+        Definitive answers are cached in-process and on disk, keyed by the
+        address with case and whitespace normalized.
+        """
+        key = _normalize_address(address)
+        with _geocode_cache_lock:
+            cached = _geocode_cache.get(key)
+            if cached is not None:
+                _geocode_cache.move_to_end(key)
+        if cached is not None:
+            success, data = cached
+            return success, dict(data)
+
+        # Then the on-disk cache, which survives restarts.
+        stored = _cache.load("geocode", _cache.cache_key(key))
+        if stored is not None:
+            success, data = stored
+            self._remember(key, success, data)
+            return success, data
+
+        success, data, cacheable = self._request_geocode(address)
+        if cacheable:
+            self._remember(key, success, data)
+            _cache.store("geocode", _cache.cache_key(key), [success, data])
+        return success, data
+
+    @staticmethod
+    def _remember(key: str, success: bool, data: Dict[str, Any]) -> None:
+        """Adds a definitive answer to the in-process LRU."""
+        with _geocode_cache_lock:
+            _geocode_cache[key] = (success, dict(data))
+            _geocode_cache.move_to_end(key)
+            while len(_geocode_cache) > GEOCODE_CACHE_MAX_ENTRIES:
+                _geocode_cache.popitem(last=False)
+
+    def _request_geocode(self, address: str) -> Tuple[bool, Dict[str, Any], bool]:
+        """
+        Calls the Geocoding API for `geocode`.
+
+        Returns:
+            (success, data, cacheable). Only definitive answers (OK and
+            ZERO_RESULTS) are cacheable; quota, auth and network failures are
+            retried on the next call.
         """
         params = {
             "address": address,
@@ -60,7 +114,7 @@ class GeocodingAPI:
                     "latitude": location["lat"],
                     "longitude": location["lng"],
                     "formatted_address": formatted_address,
-                }
+                }, True
             else:
                 # Handle API-level errors like "ZERO_RESULTS" or "REQUEST_DENIED"
                 # Return a user-friendly error message instead of the raw API status.
@@ -68,10 +122,10 @@ class GeocodingAPI:
                 return False, {
                     "error": error_message,
                     "reason": data.get("error_message", f"API returned status: {data.get('status', 'Unknown')}"),
-                }
+                }, data.get("status") == "ZERO_RESULTS"
         except requests.exceptions.RequestException as e:
             # Handle network-level errors
-            return False, {"error": "Request failed", "reason": str(e)}
+            return False, {"error": "Request failed", "reason": str(e)}, False
 
     def get_coordinates(self, address: str) -> Tuple[bool, Dict[str, Any]]:
         """
@@ -84,26 +138,8 @@ class GeocodingAPI:
 
         Returns:
             A tuple containing (success, result):
-            - If success is True, result contains the latitude and longitude.
+            - If success is True, result contains the latitude, longitude and formatted_address.
             - If success is False, result contains error information.
         """
-        success, result = self.geocode(address)
-        
-        if not success:
-            return False, result
-            
-        try:
-            # Extract the coordinates from the first result
-            location = result["results"][0]["geometry"]["location"]
-            
-            return True, {
-                "latitude": location["lat"],
-                "longitude": location["lng"],
-                "formatted_address": result["results"][0].get("formatted_address")
-            }
-            
-        except (KeyError, IndexError):
-            return False, {
-                "error": "Invalid response format",
-                "reason": "Could not extract location from geocoding response"
-            }
\ No newline at end of file
+        # geocode() already returns the flattened coordinates and shares its caches.
+        return self.geocode(address)
@@ -1,5 +1,18 @@
+import functools
 import math
 
+# Constants for distance and area calculations (in meters)
+M_PER_DEG_LAT = 111132.954  # meters per degree latitude
+M_PER_DEG_LON_EQUATOR = 111319.488  # meters per degree longitude at the equator
+
+
+
+@functools.lru_cache(maxsize=256)
+def _m_per_deg_lon(latitude: float) -> float:
+    """Meters per degree of longitude at a latitude; repeated re-grids hit the cache."""
+    return M_PER_DEG_LON_EQUATOR * math.cos(math.radians(latitude))
+
+
 class TileGenerator:
     """
     A class to generate a grid of geographic tile centroids
@@ -12,7 +25,8 @@ class TileGenerator:
 
         Args:
             target_tile_count (int): The approximate number of tiles to divide the bounding box into.
-                                     This will be used to determine the grid size (e.g., 100 -> 10x10 grid).
+                                     The grid is n x n with n = round(sqrt(target_tile_count))
+                                     (e.g., 100 -> 10x10 grid, 10 -> 3x3 grid).
         """
         if target_tile_count <= 0:
             raise ValueError("Target tile count must be a positive number.")
@@ -27,19 +41,36 @@ class TileGenerator:
                             (south_west_lat, south_west_lon, north_east_lat, north_east_lon).
 
         Returns:
-            dict: A dictionary containing the calculated 'lat_tile_size' and 'lon_tile_size'.
+            dict: A dictionary containing the integer 'tiles_per_side' and the
+                  calculated 'lat_tile_size' and 'lon_tile_size'.
         """
         sw_lat, sw_lon, ne_lat, ne_lon = bounds
         lat_diff = ne_lat - sw_lat
         lon_diff = ne_lon - sw_lon
         
-        tiles_per_side = math.sqrt(self.target_tile_count)
+        # A square grid: the tile count is exactly tiles_per_side ** 2.
+        tiles_per_side = max(1, round(math.sqrt(self.target_tile_count)))
         
         return {
+            "tiles_per_side": tiles_per_side,
             "lat_tile_size": lat_diff / tiles_per_side,
             "lon_tile_size": lon_diff / tiles_per_side,
         }
 
+    @staticmethod
+    def to_api_polygon(coordinates):
+        """
+        Converts a tile's (lat, lon) vertex tuples into the Area Insights API
+        polygon format.
+
+        Args:
+            coordinates: The tile's `polygon["coordinates"]`.
+
+        Returns:
+            dict: A polygon of the form {"coordinates": [{"latitude": ..., "longitude": ...}, ...]}.
+        """
+        return {"coordinates": [{"latitude": lat, "longitude": lon} for lat, lon in coordinates]}
+
     def generate_tiles_from_center(self, center_lat: float, center_lon: float, box_size_meters: float):
         """
         Creates a bounding box around a center point and then generates tiles within it.
@@ -53,8 +84,9 @@ class TileGenerator:
             A list of generated tiles, same as generate_tiles().
         """
         # Calculate the bounding box from the center point and size
-        m_per_deg_lat = 111132.954
-        m_per_deg_lon = 111319.488 * math.cos(math.radians(center_lat))
+        m_per_deg_lat = M_PER_DEG_LAT
+        # Rounded to ~0.1 m so nearby re-grids around the same center share an entry.
+        m_per_deg_lon = _m_per_deg_lon(round(center_lat, 6))
         
         # Avoid division by zero at the poles, though highly unlikely for this use case
         if m_per_deg_lon == 0:
@@ -82,60 +114,53 @@ class TileGenerator:
         Returns:
             list: A list of dictionaries, where each dictionary represents a tile and
                   contains 'id', 'centroid', 'polygon', 'area_sq_meters', and 'area_sq_km'.
+                  Polygon coordinates are (lat, lon) tuples; use `to_api_polygon` to
+                  convert them for the Area Insights API. Areas are not rounded.
         """
         sw_lat, sw_lon, ne_lat, ne_lon = bounds
         if not (ne_lat > sw_lat and ne_lon > sw_lon):
             raise ValueError("Invalid bounds: North-East corner must be north and east of South-West corner.")
 
-        tiles = []
-        tile_id = 0
         tile_size = self._calculate_tile_size(bounds)
+        rows = cols = tile_size["tiles_per_side"]
         lat_tile_size = tile_size["lat_tile_size"]
         lon_tile_size = tile_size["lon_tile_size"]
 
-        # Constants for area calculation (in meters)
-        m_per_deg_lat = 111132.954  # meters per degree latitude
-        m_per_deg_lon_base = 111319.488 # meters per degree longitude at the equator
-        
-        # Epsilon to handle floating point inaccuracies in loop conditions
-        epsilon = 1e-9
-
-        current_lat = sw_lat
-        while current_lat < ne_lat - epsilon:
-            current_lon = sw_lon
-            while current_lon < ne_lon - epsilon:
-                centroid_lat = current_lat + lat_tile_size / 2
-                centroid_lon = current_lon + lon_tile_size / 2
-
-                # Calculate tile area in square meters
-                tile_height_m = lat_tile_size * m_per_deg_lat
-                tile_width_m = lon_tile_size * m_per_deg_lon_base * math.cos(math.radians(centroid_lat))
-                tile_area_sq_m = tile_height_m * tile_width_m
-                tile_area_sq_km = tile_area_sq_m / 1_000_000
-
-                # Define the vertices of the tile polygon
-                coords = [
-                    {"latitude": current_lat, "longitude": current_lon},
-                    {"latitude": current_lat, "longitude": current_lon + lon_tile_size},
-                    {"latitude": current_lat + lat_tile_size, "longitude": current_lon + lon_tile_size},
-                    {"latitude": current_lat + lat_tile_size, "longitude": current_lon},
-                    {"latitude": current_lat, "longitude": current_lon}  # Close the polygon
-                ]
-
-                tiles.append({
-                    "id": tile_id,
-                    "centroid": {
-                        "lat": centroid_lat,
-                        "lon": centroid_lon,
-                    },
-                    "polygon": {
-                        "coordinates": coords
-                    },
-                    "area_sq_meters": round(tile_area_sq_m, 2),
-                    "area_sq_km": round(tile_area_sq_km, 4)
-                })
-                tile_id += 1
-                current_lon += lon_tile_size
-            current_lat += lat_tile_size
-            
-        return tiles
\ No newline at end of file
+        # Tiles are indexed by row/column instead of accumulating offsets, so
+        # the edges do not drift and every per-row value is computed once.
+        lat_edges = [sw_lat + i * lat_tile_size for i in range(rows + 1)]
+        lon_edges = [sw_lon + j * lon_tile_size for j in range(cols + 1)]
+        lon_centroids = [lon + lon_tile_size / 2 for lon in lon_edges[:-1]]
+
+        # Height is the same for every tile and width depends only on the
+        # row's latitude, so the area is one multiply per row.
+        tile_height_m = lat_tile_size * M_PER_DEG_LAT
+        tile_area_at_equator_sq_m = tile_height_m * lon_tile_size * M_PER_DEG_LON_EQUATOR
+        lat_centroids = [lat + lat_tile_size / 2 for lat in lat_edges[:-1]]
+        row_areas_sq_m = [
+            tile_area_at_equator_sq_m * math.cos(math.radians(lat)) for lat in lat_centroids
+        ]
+
+        return [
+            {
+                "id": i * cols + j,
+                "centroid": {
+                    "lat": lat_centroids[i],
+                    "lon": lon_centroids[j],
+                },
+                "polygon": {
+                    # (lat, lon) vertices of the tile polygon, closed on the first point
+                    "coordinates": (
+                        (lat_edges[i], lon_edges[j]),
+                        (lat_edges[i], lon_edges[j + 1]),
+                        (lat_edges[i + 1], lon_edges[j + 1]),
+                        (lat_edges[i + 1], lon_edges[j]),
+                        (lat_edges[i], lon_edges[j]),
+                    )
+                },
+                "area_sq_meters": row_areas_sq_m[i],
+                "area_sq_km": row_areas_sq_m[i] / 1_000_000
+            }
+            for i in range(rows)
+            for j in range(cols)
+        ]
@@ -1,9 +1,23 @@
-import os
+import asyncio
+import functools
 import json
 from typing import Any, Dict, List, Optional, Tuple, Union
 
+import httpx
 import requests
 
+from . import _cache
+from ._http import apost, maps_api_key, shared_session
+
+
+@functools.lru_cache(maxsize=8)
+def _request_headers(api_key: str) -> Dict[str, str]:
+    """Builds the JSON request headers once per key. Copy before modifying."""
+    return {
+        "Content-Type": "application/json",
+        "X-Goog-Api-Key": api_key,
+    }
+
 
 class PlacesAggregateAPI:
     """Base class for querying the Google Area Insights API."""
@@ -21,19 +35,31 @@ class PlacesAggregateAPI:
         Raises:
             ValueError: If the API key is not provided or found in the environment.
         """
-        self.api_key = api_key or os.getenv("GOOGLE_MAPS_API_KEY")
-        if not self.api_key:
-            raise ValueError(
-                "Google API key must be provided or set as GOOGLE_MAPS_API_KEY "
-                "environment variable."
-            )
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "Content-Type": "application/json",
-                "X-Goog-Api-Key": self.api_key,
-            }
-        )
+        self.api_key = api_key or maps_api_key()
+        # Pooled and shared with every other Maps client in the process, so the
+        # API key is sent per request rather than stored on the session.
+        self.session = shared_session()
+        self.headers = _request_headers(self.api_key)
+
+    @staticmethod
+    def _error_info(reason: str, status_code: Optional[int], text: Optional[str]) -> Dict[str, Any]:
+        """Builds the error dict returned for a failed HTTP response."""
+        error_info = {
+            "error": "API request failed",
+            "reason": reason,
+            "status_code": status_code
+        }
+
+        # Try to extract error message from response
+        if text:
+            try:
+                error_json = json.loads(text)
+                if 'error' in error_json and 'message' in error_json['error']:
+                    error_info["reason"] = error_json['error']['message']
+            except:
+                pass
+
+        return error_info
 
     def _post_request(
         self, endpoint: str, payload: Dict[str, Any], field_mask: Optional[List[str]] = None
@@ -51,34 +77,35 @@ class PlacesAggregateAPI:
             - If success is True, result contains the API response.
             - If success is False, result contains error information.
         """
+        # Serialize once: the same compact JSON is hashed for the cache and
+        # sent as UTF-8 bytes.
+        text = json.dumps(payload, separators=(",", ":"))
+        cache_key = _cache.cache_key(endpoint, field_mask, text)
+        body = text.encode()
+        cached = _cache.load("places", cache_key)
+        if cached is not None:
+            return True, cached
+
         url = f"{self.BASE_URL}{endpoint}"
-        headers = self.session.headers.copy()
+        headers = dict(self.headers)
         
         if field_mask:
             headers["X-Goog-FieldMask"] = ",".join(field_mask)
 
         try:
-            response = self.session.post(url, json=payload, headers=headers)
+            response = self.session.post(url, data=body, headers=headers)
             response.raise_for_status()
-            return True, response.json()
+            result = response.json()
+            _cache.store("places", cache_key, result)
+            return True, result
         except requests.exceptions.HTTPError as e:
             # Simple error reporting
-            error_info = {
-                "error": "API request failed",
-                "reason": str(e),
-                "status_code": e.response.status_code if hasattr(e, 'response') else None
-            }
-            
-            # Try to extract error message from response
-            if hasattr(e, 'response') and hasattr(e.response, 'text'):
-                try:
-                    error_json = json.loads(e.response.text)
-                    if 'error' in error_json and 'message' in error_json['error']:
-                        error_info["reason"] = error_json['error']['message']
-                except:
-                    pass
-                    
-            return False, error_info
+            error_response = getattr(e, 'response', None)
+            return False, self._error_info(
+                str(e),
+                error_response.status_code if error_response is not None else None,
+                getattr(error_response, 'text', None),
+            )
         except Exception as e:
             # General error handling for other types of errors
             return False, {
@@ -86,7 +113,97 @@ class PlacesAggregateAPI:
                 "reason": str(e)
             }
 
-    def compute_insights(
+    async def _apost_request(
+        self, endpoint: str, payload: Dict[str, Any], field_mask: Optional[List[str]] = None
+    ) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Async counterpart of `_post_request`, with the same return contract
+        and response cache. Cache reads and writes run in worker threads, so
+        SQLite I/O and its lock never block the event loop.
+        """
+        # Serialize once: the same compact JSON is hashed for the cache and
+        # sent as UTF-8 bytes.
+        text = json.dumps(payload, separators=(",", ":"))
+        cache_key = _cache.cache_key(endpoint, field_mask, text)
+        body = text.encode()
+        cached = await asyncio.to_thread(_cache.load, "places", cache_key)
+        if cached is not None:
+            return True, cached
+
+        url = f"{self.BASE_URL}{endpoint}"
+        headers = dict(self.headers)
+        if field_mask:
+            headers["X-Goog-FieldMask"] = ",".join(field_mask)
+
+        try:
+            response = await apost(url, content=body, headers=headers)
+            response.raise_for_status()
+            result = response.json()
+            await asyncio.to_thread(_cache.store, "places", cache_key, result)
+            return True, result
+        except httpx.HTTPStatusError as e:
+            return False, self._error_info(str(e), e.response.status_code, e.response.text)
+        except Exception as e:
+            return False, {
+                "error": "Request failed",
+                "reason": str(e)
+            }
+
+    @staticmethod
+    def build_common_filter(
+        included_types: Union[str, List[str]],
+        excluded_types: Optional[List[str]] = None,
+        rating_min: Optional[float] = None,
+        rating_max: Optional[float] = None,
+        operating_status: Optional[Union[str, List[str]]] = None,
+        price_levels: Optional[Union[str, List[str]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Builds the part of a computeInsights filter that does not depend on the
+        area: types, operating status, price levels and rating.
+
+        Callers searching many areas with the same filters (e.g. grid tiles) can
+        build this once and add a `locationFilter` per request.
+
+        Optional filters are only included when provided.
+        """
+        # Ensure includedTypes is a list
+        if isinstance(included_types, str):
+            included_types = [included_types]
+
+        # Build the type filter with only provided optional fields
+        type_filter: Dict[str, Any] = {
+            "includedTypes": included_types,
+        }
+        if excluded_types:
+            type_filter["excludedTypes"] = excluded_types
+
+        filter_obj: Dict[str, Any] = {
+            "typeFilter": type_filter,
+        }
+
+        # Add optional filters if they are provided
+        if operating_status is not None:
+            filter_obj["operatingStatus"] = (
+                [operating_status] if isinstance(operating_status, str) else operating_status
+            )
+
+        if price_levels is not None:
+            filter_obj["priceLevels"] = (
+                [price_levels] if isinstance(price_levels, str) else price_levels
+            )
+
+        rating_filter: Dict[str, Any] = {}
+        if rating_min is not None:
+            rating_filter["minRating"] = rating_min
+        if rating_max is not None:
+            rating_filter["maxRating"] = rating_max
+        if rating_filter:
+            filter_obj["ratingFilter"] = rating_filter
+
+        return filter_obj
+
+    def _build_insights_payload(
         self,
         insights: List[str],
         included_types: Union[str, List[str]],
@@ -99,9 +216,9 @@ class PlacesAggregateAPI:
         rating_max: Optional[float] = None,
         operating_status: Optional[Union[str, List[str]]] = None,
         price_levels: Optional[Union[str, List[str]]] = None,
-    ) -> Tuple[bool, Dict[str, Any]]:
+    ) -> Dict[str, Any]:
         """
-        Compute insights for places in a specified area.
+        Builds the computeInsights request body for a specified area.
 
         The area can be defined by either a circle (latitude, longitude, radius)
         or a custom polygon (custom_area). One of these must be provided.
@@ -130,51 +247,36 @@ class PlacesAggregateAPI:
                 "custom_area (polygon) must be provided for the location filter."
             )
 
-        # Ensure includedTypes is a list
-        if isinstance(included_types, str):
-            included_types = [included_types]
-
-        # Build the type filter with only provided optional fields
-        type_filter: Dict[str, Any] = {
-            "includedTypes": included_types,
-        }
-        if excluded_types:
-            type_filter["excludedTypes"] = excluded_types
-
-        # Build the complete filter object
+        # Build the complete filter object; the type, status, price and rating
+        # parts do not depend on the area.
         filter_obj: Dict[str, Any] = {
             "locationFilter": location_filter,
-            "typeFilter": type_filter,
+            **self.build_common_filter(
+                included_types,
+                excluded_types=excluded_types,
+                rating_min=rating_min,
+                rating_max=rating_max,
+                operating_status=operating_status,
+                price_levels=price_levels,
+            ),
         }
 
-        # Add optional filters if they are provided
-        if operating_status is not None:
-            filter_obj["operatingStatus"] = (
-                [operating_status] if isinstance(operating_status, str) else operating_status
-            )
-
-        if price_levels is not None:
-            filter_obj["priceLevels"] = (
-                [price_levels] if isinstance(price_levels, str) else price_levels
-            )
-
-        rating_filter: Dict[str, Any] = {}
-        if rating_min is not None:
-            rating_filter["minRating"] = rating_min
-        if rating_max is not None:
-            rating_filter["maxRating"] = rating_max
-        if rating_filter:
-            filter_obj["ratingFilter"] = rating_filter
-
         # Build the complete payload
-        payload = {
+        return {
             "insights": final_insights,
             "filter": filter_obj,
         }
 
-        # Make the API request
+    def compute_insights(self, insights: List[str], included_types: Union[str, List[str]], **kwargs: Any) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Compute insights for places in a specified area.
+
+        Accepts the same arguments as `_build_insights_payload`; the area is
+        either a circle (latitude, longitude, radius) or a custom_area polygon.
+        """
+        payload = self._build_insights_payload(insights, included_types, **kwargs)
         return self._post_request(endpoint=":computeInsights", payload=payload)
-    
+
     def compute_insights_raw(self, payload: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
         """
         Directly send a raw payload to the computeInsights endpoint.
@@ -188,3 +290,40 @@ class PlacesAggregateAPI:
             - If success is False, result contains error information.
         """
         return self._post_request(endpoint=":computeInsights", payload=payload)
+
+    @staticmethod
+    def _parse_count(success: bool, result: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+        """Converts a count-only response into {"count": int}."""
+        if not success:
+            return False, result
+        # int64 arrives as a string and is omitted entirely when zero.
+        return True, {"count": int(result.get("count", 0))}
+
+    def compute_count(self, filter_obj: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Counts the places matching a complete computeInsights filter.
+
+        Only the `count` field is requested, so the response carries nothing
+        else to transfer or parse.
+
+        Args:
+            filter_obj: The full `filter` object, including its `locationFilter`.
+
+        Returns:
+            A tuple containing (success, result):
+            - If success is True, result is {"count": int}.
+            - If success is False, result contains error information.
+        """
+        payload = {"insights": ["INSIGHT_COUNT"], "filter": filter_obj}
+        return self._parse_count(
+            *self._post_request(endpoint=":computeInsights", payload=payload, field_mask=["count"])
+        )
+
+    async def acompute_count(self, filter_obj: Dict[str, Any]) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Async variant of `compute_count`.
+        """
+        payload = {"insights": ["INSIGHT_COUNT"], "filter": filter_obj}
+        return self._parse_count(
+            *await self._apost_request(endpoint=":computeInsights", payload=payload, field_mask=["count"])
+        )
@@ -0,0 +1,101 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+from itertools import chain
+from typing import List, Tuple
+
+from google.adk.agents.readonly_context import ReadonlyContext
+
+# Same placeholder pattern ADK uses when injecting session state into instructions.
+_PLACEHOLDER = re.compile(r"{+[^{}]*}+")
+_STATE_PREFIXES = ("app:", "user:", "temp:")
+
+
+def _is_state_name(name: str) -> bool:
+    """Mirrors ADK: an identifier, optionally behind an app:/user:/temp: prefix."""
+    for prefix in _STATE_PREFIXES:
+        if name.startswith(prefix):
+            return name[len(prefix):].isidentifier()
+    return name.isidentifier()
+
+
+class PreparedInstruction:
+    """
+    An instruction template whose `{state_key}` placeholders are located once,
+    at import time, instead of being re-scanned with a regex on every LLM turn.
+
+    Rendering follows ADK's own state injection: `{key}` is replaced with the
+    state value (None becomes ''), `{key?}` renders '' when the key is missing,
+    and placeholders that are not plain state names, such as
+    `{geocode_result.success}`, are kept as literal text.
+
+    Pass an instance as `LlmAgent(instruction=...)`. ADK treats it as an
+    instruction provider and skips its own injection pass.
+    """
+
+    def __init__(self, template: str):
+        """
+        Splits the template into literal text and state placeholders.
+
+        Args:
+            template (str): The instruction text, written as it would be for ADK.
+
+        Raises:
+            ValueError: If the template references an artifact, which is not supported.
+        """
+        literals: List[str] = []
+        slots: List[Tuple[str, bool]] = []
+        text = ""
+        last_end = 0
+        for match in _PLACEHOLDER.finditer(template):
+            text += template[last_end:match.start()]
+            last_end = match.end()
+            name = match.group().lstrip("{").rstrip("}").strip()
+            optional = name.endswith("?")
+            name = name.removesuffix("?")
+            if name.startswith("artifact."):
+                raise ValueError(f"Artifact placeholders are not supported: {match.group()}")
+            if not _is_state_name(name):
+                text += match.group()
+                continue
+            literals.append(text)
+            slots.append((name, optional))
+            text = ""
+        literals.append(text + template[last_end:])
+
+        self.template = template
+        self._literals = tuple(literals)
+        self._slots = tuple(slots)
+
+    def __call__(self, context: ReadonlyContext) -> str:
+        """
+        Renders the instruction against the current session state.
+
+        Raises:
+            KeyError: If a required (non-`?`) placeholder is missing from state.
+        """
+        if not self._slots:
+            return self._literals[0]
+        state = context.state
+        values = []
+        for name, optional in self._slots:
+            if name in state:
+                value = state[name]
+                values.append("" if value is None else str(value))
+            elif optional:
+                values.append("")
+            else:
+                raise KeyError(f"Context variable not found: `{name}`.")
+        return "".join(chain.from_iterable(zip(self._literals[:-1], values, strict=True))) + self._literals[-1]
@@ -1,37 +1,498 @@
+import copy
+import glob
+import gzip
+import importlib.util
 import os
+import shutil
+import tempfile
+import time
+import uuid
+from typing import Dict, Iterator, Optional
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import pyarrow as pa
+import pyarrow.csv as pa_csv
 import pyarrow.parquet as pq
-from google.cloud import bigquery
+from google.cloud import bigquery, storage
+from google.cloud.storage import transfer_manager
 from google.api_core.exceptions import NotFound, Conflict
 import logging
 
-# Configure logging to provide more detailed output
+# Configure logging to provide more detailed output. The client libraries log
+# every HTTP request at DEBUG, which costs real time during large loads, so
+# that is only enabled when BQ_UTILS_DEBUG is set.
 logging.basicConfig(level=logging.INFO)
-logging.getLogger("google.cloud").setLevel(logging.DEBUG)
+logging.getLogger("google.cloud").setLevel(logging.DEBUG if os.environ.get("BQ_UTILS_DEBUG") else logging.WARNING)
+
+# Results with at least this many rows are downloaded through the BigQuery
+# Storage Read API (when google-cloud-bigquery-storage is installed); smaller
+# ones are not worth its client setup and come back faster over REST.
+STORAGE_API_MIN_ROWS = 10_000
+_HAS_BQSTORAGE = importlib.util.find_spec("google.cloud.bigquery_storage") is not None
+
+# Local files at least this large are uploaded to a GCS staging bucket (when
+# one is given) in parallel chunks and loaded from there, instead of through a
+# single-stream load_table_from_file upload.
+GCS_STAGING_MIN_BYTES = 256 * 1024 * 1024
+GCS_UPLOAD_WORKERS = 8
+# Files uploaded at the same time when several are staged for one load job.
+GCS_UPLOAD_FILE_WORKERS = 8
+
+# Read buffer for files uploaded directly with load_table_from_file.
+UPLOAD_BUFFER_BYTES = 1024 * 1024
+
+# Staged Parquet files of at least this size are split into shards of about
+# PARQUET_SHARD_TARGET_BYTES, which one load job then reads in parallel.
+PARQUET_SHARD_MIN_BYTES = 1024 * 1024 * 1024
+PARQUET_SHARD_TARGET_BYTES = 256 * 1024 * 1024
+
+# Load jobs are polled with jobs.get. LoadJob.result() waits 1 s between polls,
+# which is most of a small load's runtime, so poll from 200 ms upwards instead.
+LOAD_POLL_INITIAL_SECONDS = 0.2
+LOAD_POLL_MAXIMUM_SECONDS = 5.0
+LOAD_POLL_MULTIPLIER = 1.5
+
+# Load job configurations, built once per source format and write disposition.
+_LOAD_JOB_CONFIGS = {
+    (source_format, overwrite): bigquery.LoadJobConfig(
+        source_format=source_format,
+        write_disposition=(
+            bigquery.WriteDisposition.WRITE_TRUNCATE if overwrite else bigquery.WriteDisposition.WRITE_APPEND
+        ),
+        # Skips the CSV header row
+        **({"skip_leading_rows": 1} if source_format == bigquery.SourceFormat.CSV else {}),
+    )
+    for source_format in (
+        bigquery.SourceFormat.PARQUET,
+        bigquery.SourceFormat.CSV,
+        bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+    )
+    for overwrite in (True, False)
+}
+
+
+# Format names used in log messages.
+_FORMAT_NAMES = {
+    bigquery.SourceFormat.PARQUET: "Parquet",
+    bigquery.SourceFormat.CSV: "CSV",
+    bigquery.SourceFormat.NEWLINE_DELIMITED_JSON: "JSON",
+}
+
+
+def _load_job_config(source_format: str, overwrite: bool) -> bigquery.LoadJobConfig:
+    """
+    Returns a copy of the prebuilt load job configuration for a source format.
+
+    The copy is deep because LoadJobConfig keeps its settings in a nested
+    dict; a shallow copy would let per-job settings such as `schema` leak
+    into the shared template.
+
+    Args:
+        source_format (str): A bigquery.SourceFormat value.
+        overwrite (bool): True for WRITE_TRUNCATE, False for WRITE_APPEND.
+    """
+    return copy.deepcopy(_LOAD_JOB_CONFIGS[(source_format, overwrite)])
+
+
+# "project.dataset" IDs known to exist, mapped to their location (None until
+# looked up). Filled in by create_bigquery_dataset and _dataset_location, so
+# one get_dataset call answers both the existence check and the location.
+_KNOWN_DATASETS: Dict[str, Optional[str]] = {}
+
+# One client per project, shared by every operation in this module, so a setup
+# run that loads many files authenticates and opens its connections once.
+_clients: Dict[str, bigquery.Client] = {}
+_storage_clients: Dict[str, storage.Client] = {}
+
+
+def _get_client(project_id: str) -> bigquery.Client:
+    """
+    Returns the shared BigQuery client for a project, creating it on first use.
+
+    Args:
+        project_id (str): The Google Cloud project ID.
+    """
+    client = _clients.get(project_id)
+    if client is None:
+        client = _clients[project_id] = bigquery.Client(project=project_id)
+    return client
+
+
+def _get_storage_client(project_id: str) -> storage.Client:
+    """
+    Returns the shared Cloud Storage client for a project, creating it on first use.
+
+    Args:
+        project_id (str): The Google Cloud project ID.
+    """
+    client = _storage_clients.get(project_id)
+    if client is None:
+        client = _storage_clients[project_id] = storage.Client(project=project_id)
+    return client
+
+
+def close_clients():
+    """
+    Closes every shared BigQuery and Cloud Storage client. Later operations
+    create new ones.
+    """
+    for clients in (_clients, _storage_clients):
+        while clients:
+            _, client = clients.popitem()
+            client.close()
+
+
+def _dataset_location(client: bigquery.Client, table_ref) -> str:
+    """
+    Returns the location of a table's dataset, fetching it on first use.
+    Load jobs must run in the location of their destination dataset.
+
+    Args:
+        client (bigquery.Client): The BigQuery client to look the dataset up with.
+        table_ref: The destination table.
+    """
+    dataset_ref = f"{table_ref.project}.{table_ref.dataset_id}"
+    location = _KNOWN_DATASETS.get(dataset_ref)
+    if location is None:
+        location = _KNOWN_DATASETS[dataset_ref] = client.get_dataset(dataset_ref).location
+    return location
+
+
+def _wait_for_load(job: bigquery.LoadJob) -> None:
+    """
+    Waits for a load job to finish, polling with exponential backoff from
+    LOAD_POLL_INITIAL_SECONDS up to LOAD_POLL_MAXIMUM_SECONDS.
+
+    Args:
+        job (bigquery.LoadJob): A started load job.
+    """
+    logging.info(f"Waiting for job {job.job_id} to complete...")
+    delay = LOAD_POLL_INITIAL_SECONDS
+    # done() reloads the job state with jobs.get.
+    while not job.done():
+        time.sleep(delay)
+        delay = min(delay * LOAD_POLL_MULTIPLIER, LOAD_POLL_MAXIMUM_SECONDS)
+    # The job is finished, so this only raises its error, if any.
+    job.result()
+
+
+def _load_from_gcs(client: bigquery.Client, file_paths: list, staging_bucket: str, table_ref,
+                   job_config: bigquery.LoadJobConfig) -> bigquery.LoadJob:
+    """
+    Uploads local files to a GCS staging bucket and loads them into a table
+    with a single load job, then deletes the staged objects whether or not
+    the load succeeded.
+
+    Args:
+        client (bigquery.Client): The BigQuery client to run the job with.
+        file_paths (list): The local paths of the files to load.
+        staging_bucket (str): The GCS bucket name to stage the files in.
+        table_ref: The destination table.
+        job_config (bigquery.LoadJobConfig): The load job configuration.
+
+    Returns:
+        bigquery.LoadJob: The completed load job.
+    """
+    bucket = _get_storage_client(client.project).bucket(staging_bucket)
+    prefix = f"bigquery-staging/{uuid.uuid4().hex}"
+    # The index keeps files with the same name (e.g. shards) apart.
+    blobs = [
+        bucket.blob(f"{prefix}/{index:04d}-{os.path.basename(file_path)}")
+        for index, file_path in enumerate(file_paths)
+    ]
+
+    def upload(file_path: str, blob: storage.Blob) -> None:
+        logging.info(f"Uploading '{file_path}' to 'gs://{staging_bucket}/{blob.name}'...")
+        # Threads rather than processes, so this also works from notebooks.
+        transfer_manager.upload_chunks_concurrently(
+            file_path, blob, max_workers=GCS_UPLOAD_WORKERS, worker_type=transfer_manager.THREAD
+        )
+
+    try:
+        # Uploads are network bound, so several files go up at once.
+        with ThreadPoolExecutor(max_workers=max(1, min(len(blobs), GCS_UPLOAD_FILE_WORKERS))) as executor:
+            list(executor.map(upload, file_paths, blobs))
+
+        logging.info(f"Starting load job for table '{table_ref.table_id}' from {len(blobs)} GCS object(s)...")
+        job = client.load_table_from_uri(
+            [f"gs://{staging_bucket}/{blob.name}" for blob in blobs],
+            table_ref,
+            location=_dataset_location(client, table_ref),
+            job_config=job_config
+        )
+        _wait_for_load(job)
+        return job
+    finally:
+        for blob in blobs:
+            try:
+                blob.delete()
+            except NotFound:
+                # Never uploaded because an earlier upload failed.
+                pass
+
+
+# Parquet reads fetch each row group's column chunks together in coalesced
+# reads (pre_buffer), so a whole row group is held in memory while it is
+# decoded. buffer_size sets the read size of the column streams.
+_PARQUET_READ_OPTIONS = {"pre_buffer": True, "buffer_size": 1024 * 1024}
+
+
+def read_parquet_batched(parquet_file_path: str, batch_size: int = 65_536) -> Iterator[pa.RecordBatch]:
+    """
+    Reads a local Parquet file as a stream of record batches, so the whole
+    file is never held in memory. Each row group's column chunks are
+    prefetched in full and decoded on Arrow's thread pool, so peak memory
+    grows with the largest row group, not just the batch size.
+
+    Args:
+        parquet_file_path (str): The local path to the Parquet file.
+        batch_size (int): The maximum number of rows per batch.
+
+    Returns:
+        Iterator[pa.RecordBatch]: The file's rows, in order.
+    """
+    parquet_file = pq.ParquetFile(parquet_file_path, **_PARQUET_READ_OPTIONS)
+    yield from parquet_file.iter_batches(batch_size=batch_size, use_threads=True)
+
+
+def _shard_parquet(parquet_file_path: str, output_dir: str) -> list:
+    """
+    Splits a Parquet file into shards of roughly PARQUET_SHARD_TARGET_BYTES,
+    streaming record batches so the file is never held in memory.
+
+    Args:
+        parquet_file_path (str): The local path to the Parquet file.
+        output_dir (str): The directory to write `part-NNNN.parquet` shards to.
+
+    Returns:
+        list: The paths of the written shards, in order.
+    """
+    source = pq.ParquetFile(parquet_file_path, **_PARQUET_READ_OPTIONS)
+    bytes_per_row = os.path.getsize(parquet_file_path) / max(1, source.metadata.num_rows)
+    rows_per_shard = max(1, int(PARQUET_SHARD_TARGET_BYTES / bytes_per_row))
+
+    shard_paths: list = []
+    writer = None
+    rows_in_shard = 0
+    try:
+        for batch in source.iter_batches(batch_size=min(rows_per_shard, 64 * 1024), use_threads=True):
+            if writer is None or rows_in_shard >= rows_per_shard:
+                if writer is not None:
+                    writer.close()
+                shard_paths.append(os.path.join(output_dir, f"part-{len(shard_paths):04d}.parquet"))
+                writer = pq.ParquetWriter(shard_paths[-1], source.schema_arrow)
+                rows_in_shard = 0
+            writer.write_batch(batch)
+            rows_in_shard += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+
+    logging.info(f"Split '{parquet_file_path}' into {len(shard_paths)} shards.")
+    return shard_paths
+
+
+def _bigquery_type(arrow_type: pa.DataType) -> str:
+    """Maps a scalar Arrow type to a BigQuery type that holds all of its values."""
+    # Dictionary-encoded columns (e.g. pandas categoricals) load as their values.
+    if pa.types.is_dictionary(arrow_type):
+        arrow_type = arrow_type.value_type
+    if pa.types.is_boolean(arrow_type):
+        return "BOOLEAN"
+    # INTEGER is a signed 64-bit type, too narrow for uint64 values above 2^63 - 1.
+    if pa.types.is_uint64(arrow_type):
+        return "NUMERIC"
+    if pa.types.is_integer(arrow_type):
+        return "INTEGER"
+    if pa.types.is_floating(arrow_type):
+        return "FLOAT"
+    if pa.types.is_decimal(arrow_type):
+        return "NUMERIC" if arrow_type.precision <= 38 and arrow_type.scale <= 9 else "BIGNUMERIC"
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return "STRING"
+    if pa.types.is_binary(arrow_type) or pa.types.is_large_binary(arrow_type):
+        return "BYTES"
+    if pa.types.is_date(arrow_type):
+        return "DATE"
+    if pa.types.is_timestamp(arrow_type):
+        return "TIMESTAMP" if arrow_type.tz else "DATETIME"
+    if pa.types.is_time(arrow_type):
+        return "TIME"
+    raise ValueError(f"No BigQuery type for Arrow type '{arrow_type}'.")
+
+
+def _schema_field(field: pa.Field) -> bigquery.SchemaField:
+    """Converts an Arrow field, including lists and structs, to a SchemaField."""
+    arrow_type = field.type
+    mode = "NULLABLE" if field.nullable else "REQUIRED"
+    if pa.types.is_list(arrow_type) or pa.types.is_large_list(arrow_type):
+        arrow_type = arrow_type.value_type
+        mode = "REPEATED"
+    if pa.types.is_struct(arrow_type):
+        return bigquery.SchemaField(
+            field.name, "RECORD", mode=mode,
+            fields=[_schema_field(arrow_type.field(i)) for i in range(arrow_type.num_fields)],
+        )
+    return bigquery.SchemaField(field.name, _bigquery_type(arrow_type), mode=mode)
+
+
+def schema_from_parquet(parquet_file_path: str) -> list:
+    """
+    Builds a BigQuery schema from a Parquet file's schema, for example to load
+    CSV or JSON exports of the same data with `schema=` instead of autodetect.
+    Only the file footer is read.
+
+    Args:
+        parquet_file_path (str): The local path to the Parquet file.
+
+    Returns:
+        list: The bigquery.SchemaField for each column, in file order.
+    """
+    return [_schema_field(field) for field in pq.read_schema(parquet_file_path)]
+
+
+def _csv_to_parquet(csv_file_path: str, output_dir: str):
+    """
+    Converts a CSV file with a header row to a Snappy-compressed Parquet file,
+    streaming it one block at a time so the CSV is never held in memory.
+
+    Parquet is smaller on the wire and BigQuery loads it without parsing text
+    or detecting a schema. Column types are inferred by Arrow from the first
+    block, so they can differ from what BigQuery's CSV autodetect would pick.
+
+    Args:
+        csv_file_path (str): The local path to the CSV file.
+        output_dir (str): The directory to write the Parquet file to.
+
+    Returns:
+        str: The path of the Parquet file, or None if Arrow could not convert
+             the CSV (for example, a later block does not fit the inferred
+             types), in which case the caller should load the CSV as-is.
+    """
+    parquet_file_path = os.path.join(
+        output_dir, os.path.splitext(os.path.basename(csv_file_path))[0] + ".parquet"
+    )
+    try:
+        logging.info(f"Converting '{csv_file_path}' to Parquet...")
+        reader = pa_csv.open_csv(
+            csv_file_path,
+            # Types are inferred from the first block; a large block gives the
+            # inference more rows to look at.
+            read_options=pa_csv.ReadOptions(block_size=64 << 20),
+            # BigQuery's CSV loader reads empty fields as NULL; do the same.
+            convert_options=pa_csv.ConvertOptions(strings_can_be_null=True),
+        )
+        with pq.ParquetWriter(parquet_file_path, reader.schema, compression="snappy", use_dictionary=True) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+    except pa.ArrowException as e:
+        logging.warning(f"Could not convert '{csv_file_path}' to Parquet, loading it as CSV: {e}")
+        return None
+    return parquet_file_path
+
+
+def _gzip_file(file_path: str, output_dir: str) -> str:
+    """
+    Writes a gzip-compressed copy of a file, streaming it in 1 MiB chunks.
+
+    Compression level 1 keeps the CPU cost well below the upload time saved;
+    BigQuery detects gzip on load, so the job configuration is unchanged.
+
+    Args:
+        file_path (str): The local path to the file.
+        output_dir (str): The directory to write the `.gz` file to.
+
+    Returns:
+        str: The path of the compressed file.
+    """
+    gz_file_path = os.path.join(output_dir, os.path.basename(file_path) + ".gz")
+    logging.info(f"Compressing '{file_path}'...")
+    with open(file_path, "rb") as source, gzip.open(gz_file_path, "wb", compresslevel=1) as target:
+        shutil.copyfileobj(source, target, 1024 * 1024)
+    return gz_file_path
+
+
+def _load_local_file(client: bigquery.Client, file_path: str, table_ref, job_config: bigquery.LoadJobConfig,
+                     staging_bucket: Optional[str] = None) -> bigquery.LoadJob:
+    """
+    Loads a local file into a table and waits for the load job to finish.
+
+    Files of at least GCS_STAGING_MIN_BYTES are staged in `staging_bucket`
+    (when given) and loaded from GCS.
+
+    Args:
+        client (bigquery.Client): The BigQuery client to run the job with.
+        file_path (str): The local path to the file.
+        table_ref: The destination table.
+        job_config (bigquery.LoadJobConfig): The load job configuration.
+        staging_bucket (str): Optional GCS bucket name for staging large files.
+
+    Returns:
+        bigquery.LoadJob: The completed load job.
+    """
+    if staging_bucket and os.path.getsize(file_path) >= GCS_STAGING_MIN_BYTES:
+        return _load_from_gcs(client, [file_path], staging_bucket, table_ref, job_config)
+
+    logging.info(f"Opening local file from '{file_path}'...")
+    # A 1 MiB buffer reads the file in far fewer syscalls than the 8 KiB default.
+    with open(file_path, "rb", buffering=UPLOAD_BUFFER_BYTES) as source_file:
+        logging.info(f"Starting load job for table '{table_ref.table_id}'...")
+        job = client.load_table_from_file(
+            source_file,
+            table_ref,
+            # With a known size, files under 5 MiB go up in one multipart
+            # request instead of a resumable session.
+            size=os.path.getsize(file_path),
+            location=_dataset_location(client, table_ref),
+            job_config=job_config
+        )
+
+    # Wait for the job to complete
+    _wait_for_load(job)
+    return job
+
 
 def create_bigquery_dataset(project_id: str, dataset_id: str, location: str = "US"):
     """
     Creates a new BigQuery dataset if it does not already exist.
 
+    Datasets seen to exist are remembered for the life of the process, so
+    repeated setup calls skip the API entirely.
+
     Args:
         project_id (str): The Google Cloud project ID.
         dataset_id (str): The ID of the dataset to create.
         location (str): The geographic location for the dataset (e.g., 'US', 'EU').
                         This cannot be changed after creation.
     """
+    dataset_ref = f"{project_id}.{dataset_id}"
+    if dataset_ref in _KNOWN_DATASETS:
+        logging.info(f"Dataset '{dataset_id}' already exists. Skipping creation.")
+        return
+
     try:
         logging.info(f"Connecting to BigQuery client for project '{project_id}'...")
-        client = bigquery.Client(project=project_id)
+        client = _get_client(project_id)
+
+        try:
+            _KNOWN_DATASETS[dataset_ref] = client.get_dataset(dataset_ref).location
+            logging.info(f"Dataset '{dataset_id}' already exists. Skipping creation.")
+            return
+        except NotFound:
+            pass
 
         # Construct a full Dataset object
-        dataset = bigquery.Dataset(f"{project_id}.{dataset_id}")
+        dataset = bigquery.Dataset(dataset_ref)
         dataset.location = location
 
         logging.info(f"Attempting to create dataset '{dataset_id}' in location '{location}'...")
         dataset = client.create_dataset(dataset, timeout=30)
+        _KNOWN_DATASETS[dataset_ref] = dataset.location
         logging.info(f"Successfully created dataset '{dataset.dataset_id}'.")
     except Conflict:
+        # Created concurrently since the get_dataset check, possibly elsewhere,
+        # so the location is looked up when first needed.
+        _KNOWN_DATASETS.setdefault(dataset_ref, None)
         logging.info(f"Dataset '{dataset_id}' already exists. Skipping creation.")
     except Exception as e:
         logging.error(f"An error occurred while creating the dataset: {e}")
@@ -52,7 +513,7 @@ def write_table_from_query(project_id: str, dataset_id: str, table_id: str, quer
     """
     try:
         logging.info(f"Connecting to BigQuery client for project '{project_id}'...")
-        client = bigquery.Client(project=project_id)
+        client = _get_client(project_id)
 
         # Define the fully qualified destination table ID
         table_ref = client.dataset(dataset_id).table(table_id)
@@ -71,18 +532,14 @@ def write_table_from_query(project_id: str, dataset_id: str, table_id: str, quer
             write_disposition=write_disposition
         )
 
-        logging.info(f"Starting query job to populate table '{table_id}'...")
-        # Start the query and wait for it to complete
-        job = client.query(query, job_config=job_config)
-        
-        logging.info(f"Waiting for job {job.job_id} to complete...")
-        job.result()  # Waits for the job to finish
+        logging.info(f"Running query job to populate table '{table_id}'...")
+        # Waits by long-polling jobs.getQueryResults, which returns as soon as
+        # the job finishes instead of sleeping between jobs.get polls. No rows
+        # are fetched unless the returned iterator is read.
+        rows = client.query_and_wait(query, job_config=job_config)
 
-        logging.info(f"Job {job.job_id} completed. Table populated successfully.")
-        table = client.get_table(table_ref)
-        logging.info(
-            f"Table '{table.table_id}' now contains {table.num_rows} rows."
-        )
+        logging.info(f"Job {rows.job_id} completed. Table populated successfully.")
+        logging.info(f"Query wrote {rows.total_rows} rows to table '{table_id}'.")
 
     except NotFound:
         logging.error(f"Dataset '{dataset_id}' not found. Please create the dataset first.")
@@ -92,95 +549,162 @@ def write_table_from_query(project_id: str, dataset_id: str, table_id: str, quer
         raise
 
 
-def run_query(project_id: str, query: str) -> pd.DataFrame:
+def run_query_arrow(project_id: str, query: str) -> pa.Table:
     """
-    Executes a SQL query and returns the results as a Pandas DataFrame.
+    Executes a SQL query and returns the results as a PyArrow Table.
+
+    Arrow is the format BigQuery downloads in, so no pandas copy is made;
+    call `.to_pandas()` on the result only if a DataFrame is needed.
 
     Args:
         project_id (str): The Google Cloud project ID.
         query (str): The SQL query to execute.
 
     Returns:
-        pd.DataFrame: A DataFrame containing the query results.
+        pa.Table: A Table containing the query results.
     """
     try:
         logging.info(f"Connecting to BigQuery client for project '{project_id}'...")
-        client = bigquery.Client(project=project_id)
-
-        logging.info("Starting query job...")
-        # Start the query and wait for it to complete
-        job = client.query(query)
+        client = _get_client(project_id)
 
-        logging.info(f"Waiting for job {job.job_id} to complete...")
-        results = job.result()  # Waits for the job to finish
+        logging.info("Running query...")
+        # jobs.query waits for the query and returns the first page of rows
+        # in the same call, saving the separate job polling round-trips.
+        results = client.query_and_wait(query)
 
-        logging.info(f"Job {job.job_id} completed. Fetching results as a DataFrame...")
-        df = results.to_dataframe()
-        logging.info(f"Query returned {len(df)} rows.")
-        return df
+        use_storage_api = _HAS_BQSTORAGE and (results.total_rows or 0) >= STORAGE_API_MIN_ROWS
+        logging.info(
+            f"Job {results.job_id} completed. Fetching results as an Arrow table"
+            f"{' via the Storage API' if use_storage_api else ''}..."
+        )
+        table = results.to_arrow(create_bqstorage_client=use_storage_api)
+        logging.info(f"Query returned {table.num_rows} rows.")
+        return table
 
     except Exception as e:
         logging.error(f"An error occurred while running the query: {e}")
         raise
 
 
-def import_parquet_file(project_id: str, dataset_id: str, table_id: str, parquet_file_path: str, overwrite: bool = True):
+def run_query(project_id: str, query: str) -> pd.DataFrame:
     """
-    Loads data from a local Parquet file into a BigQuery table.
-    The table will be created if it does not exist.
+    Executes a SQL query and returns the results as a Pandas DataFrame.
+
+    The columns use Arrow-backed dtypes, so the DataFrame shares the buffers
+    of the table returned by `run_query_arrow` instead of copying them.
+
+    Args:
+        project_id (str): The Google Cloud project ID.
+        query (str): The SQL query to execute.
+
+    Returns:
+        pd.DataFrame: A DataFrame containing the query results.
+    """
+    return run_query_arrow(project_id, query).to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def _require_file(file_path: str, source_format: str):
+    """Logs and raises FileNotFoundError if a local file to import is missing."""
+    if not os.path.exists(file_path):
+        logging.error(f"{_FORMAT_NAMES[source_format]} file not found at path: {file_path}")
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+
+def _staged_paths(file_paths: list, source_format: str, output_dir: str) -> list:
+    """
+    Returns the paths to stage for a multi-file or sharded load: Parquet files
+    of at least PARQUET_SHARD_MIN_BYTES are replaced by their shards.
+
+    Args:
+        file_paths (list): The local paths of the files to load.
+        source_format (str): The bigquery.SourceFormat of the files.
+        output_dir (str): The directory to write shards to.
+    """
+    upload_paths = []
+    for index, file_path in enumerate(file_paths):
+        if source_format == bigquery.SourceFormat.PARQUET and os.path.getsize(file_path) >= PARQUET_SHARD_MIN_BYTES:
+            shard_dir = os.path.join(output_dir, str(index))
+            os.mkdir(shard_dir)
+            upload_paths.extend(_shard_parquet(file_path, shard_dir))
+        else:
+            upload_paths.append(file_path)
+    return upload_paths
+
+
+def _import_files(project_id: str, dataset_id: str, table_id: str, file_paths: list, source_format: str,
+                  overwrite: bool = True, staging_bucket: Optional[str] = None, schema: Optional[list] = None, compress: bool = False):
+    """
+    Loads local files into a BigQuery table with a single load job; the shared
+    body of the import_* functions.
+
+    With a `staging_bucket`, several files, or one Parquet file of at least
+    PARQUET_SHARD_MIN_BYTES, are staged there and loaded from GCS by one job.
+    Otherwise each file is loaded with `_load_local_file`, one job per file,
+    and files after the first are appended.
 
     Args:
         project_id (str): The Google Cloud project ID.
         dataset_id (str): The ID of the target dataset.
         table_id (str): The ID of the target table.
-        parquet_file_path (str): The local path to the Parquet file.
+        file_paths (list): The local paths of the files.
+        source_format (str): The bigquery.SourceFormat of the files.
         overwrite (bool): If True, the table will be overwritten (truncated). If False,
                           the results will be appended to the table.
+        staging_bucket (str): Optional GCS bucket name for staging.
+        schema (list): For CSV and JSON, an optional list of bigquery.SchemaField;
+                       the schema is autodetected when it is None.
+        compress (bool): If True, files that are not staged are gzip-compressed
+                         before upload.
     """
-    if not os.path.exists(parquet_file_path):
-        logging.error(f"Parquet file not found at path: {parquet_file_path}")
-        raise FileNotFoundError(f"File not found: {parquet_file_path}")
+    for file_path in file_paths:
+        _require_file(file_path, source_format)
 
     try:
         logging.info(f"Connecting to BigQuery client for project '{project_id}'...")
-        client = bigquery.Client(project=project_id)
-        
+        client = _get_client(project_id)
+
         # Define the fully qualified destination table ID
         table_ref = client.dataset(dataset_id).table(table_id)
 
         # Determine the write disposition based on the 'overwrite' parameter
         if overwrite:
-            write_disposition = bigquery.WriteDisposition.WRITE_TRUNCATE
             logging.info(f"Setting job disposition to WRITE_TRUNCATE (overwrite).")
         else:
-            write_disposition = bigquery.WriteDisposition.WRITE_APPEND
             logging.info(f"Setting job disposition to WRITE_APPEND (append).")
 
-        # Configure the load job for a Parquet file
-        job_config = bigquery.LoadJobConfig(
-            source_format=bigquery.SourceFormat.PARQUET,
-            write_disposition=write_disposition
-        )
+        # Configure the load job; Parquet files carry their own schema, other
+        # formats auto-detect it only when none was given
+        job_config = _load_job_config(source_format, overwrite)
+        if source_format != bigquery.SourceFormat.PARQUET:
+            job_config.autodetect = schema is None
+            job_config.schema = schema
 
-        logging.info(f"Opening local Parquet file from '{parquet_file_path}'...")
-        with open(parquet_file_path, "rb") as source_file:
-            logging.info(f"Starting load job for table '{table_id}'...")
-            job = client.load_table_from_file(
-                source_file,
-                table_ref,
-                location="US",  # Must match the dataset location
-                job_config=job_config
-            )
-
-        # Wait for the job to complete
-        logging.info(f"Waiting for job {job.job_id} to complete...")
-        job.result()
-
-        logging.info(f"Job {job.job_id} completed. Data loaded successfully.")
-        table = client.get_table(table_ref)
-        logging.info(
-            f"Loaded {table.num_rows} rows and {len(table.schema)} columns to table '{table_id}'."
+        shard = (
+            source_format == bigquery.SourceFormat.PARQUET
+            and os.path.getsize(file_paths[0]) >= PARQUET_SHARD_MIN_BYTES
         )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            if staging_bucket and (len(file_paths) > 1 or shard):
+                upload_paths = _staged_paths(file_paths, source_format, tmp_dir)
+                jobs = [_load_from_gcs(client, upload_paths, staging_bucket, table_ref, job_config)]
+            else:
+                if len(file_paths) > 1:
+                    logging.warning("No staging bucket given; loading the files with one job each.")
+                jobs = []
+                for file_path in file_paths:
+                    # Staged files stay uncompressed: BigQuery cannot split a gzip
+                    # file across readers, and compressed loads are capped at 4 GB.
+                    staged = staging_bucket and os.path.getsize(file_path) >= GCS_STAGING_MIN_BYTES
+                    upload_path = _gzip_file(file_path, tmp_dir) if compress and not staged else file_path
+                    jobs.append(_load_local_file(client, upload_path, table_ref, job_config, staging_bucket))
+                    # Only the first job may truncate the table.
+                    job_config.write_disposition = bigquery.WriteDisposition.WRITE_APPEND
+
+        for job in jobs:
+            logging.info(f"Job {job.job_id} completed. Data loaded successfully.")
+        # Finished jobs report their row counts; no get_table round-trip needed.
+        rows = sum(job.output_rows or 0 for job in jobs)
+        logging.info(f"Loaded {rows} rows from {len(file_paths)} file(s) to table '{table_id}'.")
 
     except NotFound:
         logging.error(f"Dataset '{dataset_id}' not found. Please create the dataset first.")
@@ -189,135 +713,126 @@ def import_parquet_file(project_id: str, dataset_id: str, table_id: str, parquet
         logging.error(f"An error occurred during the table load job: {e}")
         raise
 
-def import_csv_file(project_id: str, dataset_id: str, table_id: str, csv_file_path: str, overwrite: bool = True):
+
+def import_parquet_file(project_id: str, dataset_id: str, table_id: str, parquet_file_path: str, overwrite: bool = True, staging_bucket: Optional[str] = None):
     """
-    Loads data from a local CSV file into a BigQuery table.
-    The table will be created with an autodetected schema if it does not exist.
+    Loads data from a local Parquet file into a BigQuery table.
+    The table will be created if it does not exist.
 
     Args:
         project_id (str): The Google Cloud project ID.
         dataset_id (str): The ID of the target dataset.
         table_id (str): The ID of the target table.
-        csv_file_path (str): The local path to the CSV file.
+        parquet_file_path (str): The local path to the Parquet file.
         overwrite (bool): If True, the table will be overwritten (truncated). If False,
                           the results will be appended to the table.
+        staging_bucket (str): Optional GCS bucket name. Files of at least
+                              GCS_STAGING_MIN_BYTES are uploaded there in parallel
+                              chunks and loaded from GCS; files of at least
+                              PARQUET_SHARD_MIN_BYTES are split into shards first.
     """
-    if not os.path.exists(csv_file_path):
-        logging.error(f"CSV file not found at path: {csv_file_path}")
-        raise FileNotFoundError(f"File not found: {csv_file_path}")
+    _import_files(
+        project_id, dataset_id, table_id, [parquet_file_path], bigquery.SourceFormat.PARQUET, overwrite, staging_bucket
+    )
 
-    try:
-        logging.info(f"Connecting to BigQuery client for project '{project_id}'...")
-        client = bigquery.Client(project=project_id)
-        
-        # Define the fully qualified destination table ID
-        table_ref = client.dataset(dataset_id).table(table_id)
 
-        # Determine the write disposition based on the 'overwrite' parameter
-        if overwrite:
-            write_disposition = bigquery.WriteDisposition.WRITE_TRUNCATE
-            logging.info(f"Setting job disposition to WRITE_TRUNCATE (overwrite).")
-        else:
-            write_disposition = bigquery.WriteDisposition.WRITE_APPEND
-            logging.info(f"Setting job disposition to WRITE_APPEND (append).")
+def import_parquet_files(project_id: str, dataset_id: str, table_id: str, parquet_file_paths,
+                         staging_bucket: Optional[str] = None, overwrite: bool = True):
+    """
+    Loads several local Parquet files into a BigQuery table with a single load
+    job, staging them in GCS first (a single file is loaded like
+    `import_parquet_file`). One job instead of one per file saves the per-job
+    overhead and counts once against the table's daily load job quota.
+    Without a staging bucket, the files are loaded with one job each.
+    The table will be created if it does not exist.
 
-        # Configure the load job for a CSV file with auto-detection
-        job_config = bigquery.LoadJobConfig(
-            source_format=bigquery.SourceFormat.CSV,
-            skip_leading_rows=1, # Skips the header row
-            autodetect=True,
-            write_disposition=write_disposition
-        )
+    Args:
+        project_id (str): The Google Cloud project ID.
+        dataset_id (str): The ID of the target dataset.
+        table_id (str): The ID of the target table.
+        parquet_file_paths (str | list): A list of local Parquet file paths, or a glob
+                                         pattern such as 'data/*.parquet'.
+        staging_bucket (str): Optional GCS bucket name to stage the files in. Files of
+                              at least PARQUET_SHARD_MIN_BYTES are split into shards first.
+        overwrite (bool): If True, the table will be overwritten (truncated). If False,
+                          the results will be appended to the table.
+    """
+    if isinstance(parquet_file_paths, str):
+        parquet_file_paths = sorted(glob.glob(parquet_file_paths))
+    if not parquet_file_paths:
+        logging.error("No Parquet files to load.")
+        raise FileNotFoundError("No Parquet files to load.")
 
-        logging.info(f"Opening local CSV file from '{csv_file_path}'...")
-        with open(csv_file_path, "rb") as source_file:
-            logging.info(f"Starting load job for table '{table_id}'...")
-            job = client.load_table_from_file(
-                source_file,
-                table_ref,
-                location="US",  # Must match the dataset location
-                job_config=job_config
-            )
-
-        # Wait for the job to complete
-        logging.info(f"Waiting for job {job.job_id} to complete...")
-        job.result()
-
-        logging.info(f"Job {job.job_id} completed. Data loaded successfully.")
-        table = client.get_table(table_ref)
-        logging.info(
-            f"Loaded {table.num_rows} rows and {len(table.schema)} columns to table '{table_id}'."
-        )
+    _import_files(
+        project_id, dataset_id, table_id, list(parquet_file_paths), bigquery.SourceFormat.PARQUET, overwrite,
+        staging_bucket,
+    )
 
-    except NotFound:
-        logging.error(f"Dataset '{dataset_id}' not found. Please create the dataset first.")
-        raise
-    except Exception as e:
-        logging.error(f"An error occurred during the table load job: {e}")
-        raise
 
-def import_json_file(project_id: str, dataset_id: str, table_id: str, json_file_path: str, overwrite: bool = True):
+def import_csv_file(project_id: str, dataset_id: str, table_id: str, csv_file_path: str, overwrite: bool = True, staging_bucket: Optional[str] = None,
+                    convert_to_parquet: bool = False, schema: Optional[list] = None):
     """
-    Loads data from a local JSON file (newline-delimited) into a BigQuery table.
-    The table will be created with an autodetected schema if it does not exist.
+    Loads data from a local CSV file into a BigQuery table.
+    The table will be created with the given or an autodetected schema if it does not exist.
 
     Args:
         project_id (str): The Google Cloud project ID.
         dataset_id (str): The ID of the target dataset.
         table_id (str): The ID of the target table.
-        json_file_path (str): The local path to the JSON file.
+        csv_file_path (str): The local path to the CSV file.
         overwrite (bool): If True, the table will be overwritten (truncated). If False,
                           the results will be appended to the table.
+        staging_bucket (str): Optional GCS bucket name. Files of at least
+                              GCS_STAGING_MIN_BYTES are uploaded there in parallel
+                              chunks and loaded from GCS.
+        convert_to_parquet (bool): If True, the CSV is converted to Parquet locally and
+                                   loaded with `import_parquet_file`, falling back to a
+                                   CSV load if Arrow cannot parse it. Column types then
+                                   come from Arrow's inference rather than BigQuery's
+                                   CSV autodetect and may differ, so leave this off when
+                                   appending to an existing table. Ignored when a
+                                   schema is given, so BigQuery parses to that schema.
+        schema (list): Optional list of bigquery.SchemaField. When given, schema
+                       autodetection is skipped.
     """
-    if not os.path.exists(json_file_path):
-        logging.error(f"JSON file not found at path: {json_file_path}")
-        raise FileNotFoundError(f"File not found: {json_file_path}")
+    _require_file(csv_file_path, bigquery.SourceFormat.CSV)
 
-    try:
-        logging.info(f"Connecting to BigQuery client for project '{project_id}'...")
-        client = bigquery.Client(project=project_id)
-        
-        # Define the fully qualified destination table ID
-        table_ref = client.dataset(dataset_id).table(table_id)
+    if convert_to_parquet and schema is None:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            parquet_file_path = _csv_to_parquet(csv_file_path, tmp_dir)
+            if parquet_file_path is not None:
+                return import_parquet_file(
+                    project_id, dataset_id, table_id, parquet_file_path, overwrite, staging_bucket
+                )
 
-        # Determine the write disposition based on the 'overwrite' parameter
-        if overwrite:
-            write_disposition = bigquery.WriteDisposition.WRITE_TRUNCATE
-            logging.info(f"Setting job disposition to WRITE_TRUNCATE (overwrite).")
-        else:
-            write_disposition = bigquery.WriteDisposition.WRITE_APPEND
-            logging.info(f"Setting job disposition to WRITE_APPEND (append).")
+    _import_files(
+        project_id, dataset_id, table_id, [csv_file_path], bigquery.SourceFormat.CSV, overwrite, staging_bucket,
+        schema=schema,
+    )
 
-        # Configure the load job for a JSON file
-        job_config = bigquery.LoadJobConfig(
-            source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
-            autodetect=True,
-            write_disposition=write_disposition
-        )
 
-        logging.info(f"Opening local JSON file from '{json_file_path}'...")
-        with open(json_file_path, "rb") as source_file:
-            logging.info(f"Starting load job for table '{table_id}'...")
-            job = client.load_table_from_file(
-                source_file,
-                table_ref,
-                location="US",  # Must match the dataset location
-                job_config=job_config
-            )
-
-        # Wait for the job to complete
-        logging.info(f"Waiting for job {job.job_id} to complete...")
-        job.result()
-
-        logging.info(f"Job {job.job_id} completed. Data loaded successfully.")
-        table = client.get_table(table_ref)
-        logging.info(
-            f"Loaded {table.num_rows} rows and {len(table.schema)} columns to table '{table_id}'."
-        )
+def import_json_file(project_id: str, dataset_id: str, table_id: str, json_file_path: str, overwrite: bool = True, staging_bucket: Optional[str] = None,
+                     compress: bool = True, schema: Optional[list] = None):
+    """
+    Loads data from a local JSON file (newline-delimited) into a BigQuery table.
+    The table will be created with the given or an autodetected schema if it does not exist.
 
-    except NotFound:
-        logging.error(f"Dataset '{dataset_id}' not found. Please create the dataset first.")
-        raise
-    except Exception as e:
-        logging.error(f"An error occurred during the table load job: {e}")
-        raise
+    Args:
+        project_id (str): The Google Cloud project ID.
+        dataset_id (str): The ID of the target dataset.
+        table_id (str): The ID of the target table.
+        json_file_path (str): The local path to the JSON file.
+        overwrite (bool): If True, the table will be overwritten (truncated). If False,
+                          the results will be appended to the table.
+        staging_bucket (str): Optional GCS bucket name. Files of at least
+                              GCS_STAGING_MIN_BYTES are uploaded there in parallel
+                              chunks and loaded from GCS.
+        compress (bool): If True, files that are not staged are gzip-compressed
+                         before upload.
+        schema (list): Optional list of bigquery.SchemaField. When given, schema
+                       autodetection is skipped.
+    """
+    _import_files(
+        project_id, dataset_id, table_id, [json_file_path], bigquery.SourceFormat.NEWLINE_DELIMITED_JSON, overwrite,
+        staging_bucket, schema=schema, compress=compress,
+    )
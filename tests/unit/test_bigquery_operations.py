@@ -0,0 +1,111 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+pytest.importorskip("google.cloud.storage")
+
+# The setup scripts are run from their own directory, not installed.
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(__file__), "..", "..", "deployment", "bigquery_setup_scripts"
+    ),
+)
+from utils.bigquery_operations import schema_from_parquet  # noqa: E402
+
+
+def _schema(tmp_path: Path, table: Any) -> list:
+    """Writes `table` to Parquet and returns (name, type, mode) per field."""
+    path = str(tmp_path / "table.parquet")
+    pq.write_table(table, path)
+    return [
+        (field.name, field.field_type, field.mode)
+        for field in schema_from_parquet(path)
+    ]
+
+
+def test_scalar_types(tmp_path: Path) -> None:
+    """Scalar Arrow types map to the BigQuery types Parquet loads produce."""
+    table = pa.table(
+        {
+            "flag": pa.array([True], pa.bool_()),
+            "count": pa.array([1], pa.int64()),
+            "ratio": pa.array([0.5], pa.float64()),
+            "name": pa.array(["a"], pa.string()),
+            "required": pa.array([1], pa.int32()),
+        }
+    ).cast(
+        pa.schema(
+            [
+                pa.field("flag", pa.bool_()),
+                pa.field("count", pa.int64()),
+                pa.field("ratio", pa.float64()),
+                pa.field("name", pa.string()),
+                pa.field("required", pa.int32(), nullable=False),
+            ]
+        )
+    )
+
+    assert _schema(tmp_path, table) == [
+        ("flag", "BOOLEAN", "NULLABLE"),
+        ("count", "INTEGER", "NULLABLE"),
+        ("ratio", "FLOAT", "NULLABLE"),
+        ("name", "STRING", "NULLABLE"),
+        ("required", "INTEGER", "REQUIRED"),
+    ]
+
+
+def test_dictionary_columns_use_their_value_type(tmp_path: Path) -> None:
+    """Dictionary-encoded columns, such as pandas categoricals, load as their values."""
+    table = pa.table(
+        {"category": pa.array(["cafe", "bakery", "cafe"]).dictionary_encode()}
+    )
+
+    assert _schema(tmp_path, table) == [("category", "STRING", "NULLABLE")]
+
+
+def test_uint64_maps_to_numeric(tmp_path: Path) -> None:
+    """uint64 values above the INTEGER range must not overflow."""
+    table = pa.table({"id": pa.array([2**64 - 1], pa.uint64())})
+
+    assert _schema(tmp_path, table) == [("id", "NUMERIC", "NULLABLE")]
+
+
+def test_lists_and_structs(tmp_path: Path) -> None:
+    """Lists become REPEATED fields and structs become RECORDs."""
+    table = pa.table(
+        {
+            "tags": pa.array([["a", "b"]], pa.list_(pa.string())),
+            "point": pa.array([{"lat": 1.0, "lon": 2.0}]),
+        }
+    )
+    path = str(tmp_path / "nested.parquet")
+    pq.write_table(table, path)
+    tags, point = schema_from_parquet(path)
+
+    assert (tags.field_type, tags.mode) == ("STRING", "REPEATED")
+    assert point.field_type == "RECORD"
+    assert [(field.name, field.field_type) for field in point.fields] == [
+        ("lat", "FLOAT"),
+        ("lon", "FLOAT"),
+    ]
@@ -0,0 +1,83 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from app.sub_agents.geocoder.tools import _cache
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Points the cache at a temporary directory with a fresh connection."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setattr(_cache, "_connection", None)
+    monkeypatch.setattr(_cache, "_disabled", False)
+    monkeypatch.setattr(_cache, "_uncommitted", 0)
+    yield
+    if _cache._connection is not None:
+        _cache._connection.close()
+
+
+def test_stored_values_round_trip() -> None:
+    """A stored value is loaded back unchanged."""
+    key = _cache.cache_key(":computeInsights", ["count"], '{"a":1}')
+    _cache.store("places", key, {"count": "4"})
+
+    assert _cache.load("places", key) == {"count": "4"}
+    assert _cache.load("geocode", key) is None
+
+
+def test_expired_values_are_not_returned(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A value is a miss once its TTL has passed."""
+    now = [1_000_000.0]
+    monkeypatch.setattr(_cache.time, "time", lambda: now[0])
+    _cache.store("places", "key", {"count": "4"}, ttl_seconds=60)
+
+    now[0] += 59
+    assert _cache.load("places", "key") == {"count": "4"}
+    now[0] += 2
+    assert _cache.load("places", "key") is None
+
+
+def test_flush_commits_pending_writes() -> None:
+    """Writes batched below the commit threshold are committed by flush."""
+    _cache.store("places", "first", 1)
+    _cache.store("places", "second", 2)
+    connection = _cache._connection
+    assert connection is not None
+    pending = connection.in_transaction
+
+    _cache.flush()
+
+    assert pending
+    assert not connection.in_transaction
+    assert _cache._uncommitted == 0
+
+
+def test_unusable_directory_disables_the_cache(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """If the cache directory cannot be created, every lookup misses."""
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(blocker))
+
+    _cache.store("places", "key", 1)
+
+    assert _cache.load("places", "key") is None
+    assert _cache._disabled
@@ -0,0 +1,71 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from unittest import mock
+
+import pytest
+
+from app.sub_agents.geocoder.tools import _cache, geocoding
+from app.sub_agents.geocoder.tools.geocoding import GeocodingAPI
+
+
+@pytest.fixture(autouse=True)
+def _no_caches(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Keeps each test off the on-disk cache and out of the in-process LRU."""
+    monkeypatch.setattr(_cache, "load", lambda namespace, key: None)
+    monkeypatch.setattr(_cache, "store", lambda namespace, key, value: None)
+    geocoding._geocode_cache.clear()
+
+
+def _api(payload: dict) -> GeocodingAPI:
+    """A client whose session answers every request with `payload`."""
+    api = GeocodingAPI(api_key="test-key")
+    api.session = mock.Mock()
+    api.session.get.return_value.json.return_value = payload
+    return api
+
+
+def test_get_coordinates_returns_the_flattened_location() -> None:
+    """A successful geocode is returned as-is, not re-parsed as a raw response."""
+    api = _api(
+        {
+            "status": "OK",
+            "results": [
+                {
+                    "geometry": {"location": {"lat": 30.27, "lng": -97.74}},
+                    "formatted_address": "Austin, TX, USA",
+                }
+            ],
+        }
+    )
+
+    assert api.get_coordinates("Austin, TX") == (
+        True,
+        {
+            "latitude": 30.27,
+            "longitude": -97.74,
+            "formatted_address": "Austin, TX, USA",
+        },
+    )
+
+
+def test_get_coordinates_reports_no_results() -> None:
+    """ZERO_RESULTS comes back as a failure with a readable error."""
+    success, result = _api({"status": "ZERO_RESULTS", "results": []}).get_coordinates(
+        "nowhere"
+    )
+
+    assert not success
+    assert result["error"] == "No results found"
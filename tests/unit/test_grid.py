@@ -0,0 +1,71 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import pytest
+
+from app.sub_agents.geocoder.tools.agent_functions import _superblocks
+from app.sub_agents.geocoder.tools.grid import TileGenerator
+
+
+@pytest.mark.parametrize(
+    "target, per_side", [(1, 1), (10, 3), (16, 4), (20, 4), (100, 10)]
+)
+def test_tile_count_is_an_exact_square(target: int, per_side: int) -> None:
+    """The grid is n x n with n = round(sqrt(target_tile_count))."""
+    tiles = TileGenerator(target).generate_tiles_from_center(30.27, -97.74, 1000.0)
+
+    assert len(tiles) == per_side**2
+    assert [tile["id"] for tile in tiles] == list(range(per_side**2))
+
+
+def test_tiles_cover_the_bounds() -> None:
+    """Edge tiles share the bounding box's corners, without drift."""
+    bounds = (30.0, -98.0, 30.3, -97.7)
+    tiles = TileGenerator(9).generate_tiles(bounds)
+
+    assert tiles[0]["polygon"]["coordinates"][0] == (30.0, -98.0)
+    assert tiles[-1]["polygon"]["coordinates"][2] == pytest.approx((30.3, -97.7))
+
+
+def test_invalid_bounds_are_rejected() -> None:
+    """The north-east corner must lie north and east of the south-west one."""
+    with pytest.raises(ValueError):
+        TileGenerator(4).generate_tiles((30.3, -97.7, 30.0, -98.0))
+
+
+def test_superblocks_group_the_grid() -> None:
+    """A 5 x 5 grid in 2 x 2 blocks gives 9 blocks, smaller along the edges."""
+    tiles = TileGenerator(25).generate_tiles_from_center(30.27, -97.74, 1000.0)
+    blocks = _superblocks(tiles, 2)
+
+    assert len(blocks) == 9
+    assert sorted(len(block) for block in blocks) == [1, 2, 2, 2, 2, 4, 4, 4, 4]
+    assert [tile["id"] for tile in blocks[0]] == [0, 1, 5, 6]
+    assert sorted(tile["id"] for block in blocks for tile in block) == list(range(25))
+
+
+def test_superblocks_of_one_keep_every_tile_apart() -> None:
+    """A merge factor of 1 gives one block per tile."""
+    tiles = TileGenerator(9).generate_tiles_from_center(30.27, -97.74, 1000.0)
+
+    assert _superblocks(tiles, 1) == [[tile] for tile in tiles]
+
+
+def test_superblocks_reject_a_non_positive_factor() -> None:
+    """A merge factor below 1 is an error."""
+    with pytest.raises(ValueError):
+        _superblocks(
+            TileGenerator(4).generate_tiles_from_center(30.27, -97.74, 1000.0), 0
+        )
@@ -0,0 +1,55 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import pytest
+
+from app.sub_agents.geocoder.tools import _http
+from app.sub_agents.geocoder.tools._http import _RateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> list:
+    """Freezes the limiter's clock; tests advance it by setting clock[0]."""
+    now = [100.0]
+    monkeypatch.setattr(_http.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_burst_goes_out_immediately(clock: list) -> None:
+    """The first `burst` requests do not wait."""
+    limiter = _RateLimiter(rate=60, per=60.0, burst=3)
+
+    assert [limiter.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+
+
+def test_requests_beyond_the_burst_are_spaced(clock: list) -> None:
+    """Past the burst, each request waits one more interval than the last."""
+    limiter = _RateLimiter(rate=60, per=60.0, burst=3)
+    for _ in range(3):
+        limiter.reserve()
+
+    assert [limiter.reserve() for _ in range(3)] == pytest.approx([1.0, 2.0, 3.0])
+
+
+def test_idle_time_refills_the_bucket(clock: list) -> None:
+    """After a quiet period the limiter allows a fresh burst."""
+    limiter = _RateLimiter(rate=60, per=60.0, burst=2)
+    for _ in range(4):
+        limiter.reserve()
+
+    clock[0] += 60.0
+
+    assert [limiter.reserve() for _ in range(2)] == [0.0, 0.0]
+    assert limiter.reserve() == pytest.approx(1.0)
@@ -0,0 +1,56 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import inspect
+import threading
+import time
+
+from app.sub_agents.execute_sql.agent import _off_loop
+
+
+def _blocking_tool(
+    project_id: str, user_query_with_context: str, credentials: object
+) -> dict:
+    """Stands in for ask_data_insights."""
+    time.sleep(0.2)
+    return {"status": "SUCCESS", "thread": threading.get_ident()}
+
+
+def test_off_loop_keeps_the_signature() -> None:
+    """ADK builds the declaration and injects credentials from the signature."""
+    wrapped = _off_loop(_blocking_tool)
+    assert inspect.iscoroutinefunction(wrapped)
+    assert inspect.signature(wrapped) == inspect.signature(_blocking_tool)
+
+
+def test_off_loop_calls_overlap() -> None:
+    """Parallel tool calls gathered by ADK run concurrently, off the loop thread."""
+    wrapped = _off_loop(_blocking_tool)
+
+    async def call_twice() -> list:
+        return await asyncio.gather(
+            *(
+                wrapped(project_id="p", user_query_with_context="q", credentials=None)
+                for _ in range(2)
+            )
+        )
+
+    start = time.monotonic()
+    results = asyncio.run(call_twice())
+    elapsed = time.monotonic() - start
+
+    assert all(result["status"] == "SUCCESS" for result in results)
+    assert threading.get_ident() not in {result["thread"] for result in results}
+    assert elapsed < 0.35
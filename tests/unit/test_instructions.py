@@ -0,0 +1,86 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+from typing import Any
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.sessions import InMemorySessionService
+from google.adk.utils.instructions_utils import inject_session_state
+
+from app.utils.instructions import PreparedInstruction
+
+STATE: dict[str, Any] = {
+    "name": "Ada",
+    "empty": None,
+    "count": 3,
+    "app:region": "Austin",
+    "user:plan": "pro",
+}
+
+
+def _context(state: dict[str, Any]) -> ReadonlyContext:
+    """A read-only context over a fresh in-memory session holding `state`."""
+    session_service = InMemorySessionService()
+    session = session_service.create_session_sync(
+        app_name="test", user_id="user", state=state
+    )
+    invocation_context = InvocationContext(
+        session_service=session_service,
+        invocation_id="invocation",
+        agent=LlmAgent(name="agent"),
+        session=session,
+    )
+    return ReadonlyContext(invocation_context)
+
+
+@pytest.mark.parametrize(
+    "template",
+    [
+        "No placeholders at all.",
+        "Hello {name}, you have {count} items.",
+        "{name}{count}",
+        "Missing but optional: [{absent?}] and present: [{name?}].",
+        "None renders empty: [{empty}].",
+        "Prefixed: {app:region} / {user:plan}.",
+        "Not state names stay literal: {geocode_result.success} {not a name} {{name}}.",
+        "Trailing text after the last {name} placeholder.",
+    ],
+)
+def test_renders_like_adk(template: str) -> None:
+    """Rendering matches ADK's own injection for the same template and state."""
+    context = _context(STATE)
+    expected = asyncio.run(inject_session_state(template, context))
+
+    assert PreparedInstruction(template)(context) == expected
+
+
+def test_missing_required_key_raises_like_adk() -> None:
+    """A missing, non-optional key is a KeyError in both."""
+    context = _context({})
+
+    with pytest.raises(KeyError):
+        asyncio.run(inject_session_state("Hello {name}.", context))
+    with pytest.raises(KeyError):
+        PreparedInstruction("Hello {name}.")(context)
+
+
+def test_artifact_placeholders_are_rejected() -> None:
+    """Artifacts need an async lookup, so templates using them fail early."""
+    with pytest.raises(ValueError):
+        PreparedInstruction("See {artifact.report}.")
@@ -0,0 +1,108 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+import asyncio
+from collections.abc import AsyncGenerator
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from pydantic import ConfigDict
+
+from app.sub_agents.execute_sql.parallel import FanOutAgent
+
+
+class _Counter:
+    """Tracks how many branches are working at once."""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+
+
+class _SlowAgent(BaseAgent):
+    """Emits two events, doing some simulated work before each."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    counter: _Counter
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        for step in range(2):
+            self.counter.active += 1
+            self.counter.peak = max(self.counter.peak, self.counter.active)
+            await asyncio.sleep(0.02)
+            self.counter.active -= 1
+            yield Event(
+                author=self.name,
+                invocation_id=ctx.invocation_id,
+                branch=ctx.branch,
+                content=types.Content(
+                    role="model", parts=[types.Part(text=f"{self.name} {step}")]
+                ),
+            )
+
+
+async def _run(agent: BaseAgent, sessions: int) -> list:
+    """Runs `sessions` concurrent invocations and returns their events."""
+    runner = InMemoryRunner(agent=agent, app_name="test")
+
+    async def one_session() -> list:
+        session = await runner.session_service.create_session(
+            app_name="test", user_id="user"
+        )
+        message = types.Content(role="user", parts=[types.Part(text="go")])
+        return [
+            event
+            async for event in runner.run_async(
+                user_id="user", session_id=session.id, new_message=message
+            )
+        ]
+
+    return await asyncio.gather(*(one_session() for _ in range(sessions)))
+
+
+def test_concurrency_is_capped_across_invocations() -> None:
+    """Branches from concurrent sessions share the cap, and every event arrives."""
+    counter = _Counter()
+    agent = FanOutAgent(
+        name="FanOut",
+        max_concurrency=2,
+        sub_agents=[_SlowAgent(name=f"branch_{i}", counter=counter) for i in range(4)],
+    )
+
+    results = asyncio.run(_run(agent, sessions=3))
+
+    assert [len(events) for events in results] == [8, 8, 8]
+    assert counter.peak == 2
+
+
+def test_branches_are_isolated() -> None:
+    """Each sub-agent runs on a branch of its own."""
+    counter = _Counter()
+    agent = FanOutAgent(
+        name="FanOut",
+        sub_agents=[_SlowAgent(name=f"branch_{i}", counter=counter) for i in range(2)],
+    )
+
+    (events,) = asyncio.run(_run(agent, sessions=1))
+
+    assert {event.author: event.branch for event in events} == {
+        "branch_0": "FanOut.branch_0",
+        "branch_1": "FanOut.branch_1",
+    }
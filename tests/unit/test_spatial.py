@@ -0,0 +1,26 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from app.sub_agents.execute_sql.spatial import spatial_filter
+
+
+def test_spatial_filter_uses_each_tables_geography_column() -> None:
+    """Each table is filtered on its own geography column."""
+    assert spatial_filter("us_places", -97.74, 30.27, 2000) == (
+        "ST_DISTANCE(ST_GEOGPOINT(-97.74, 30.27), geometry) <= 2000"
+    )
+    assert spatial_filter("demographic_data", -97.74, 30.27, 5000) == (
+        "ST_DISTANCE(ST_GEOGPOINT(-97.74, 30.27), point_geom) <= 5000"
+    )